@@ -0,0 +1,150 @@
+"""
+Batch degrees of separation over a file of person pairs.
+
+Each line of the pairs file holds a source and a target, as names or
+IMDB ids, separated by a comma or a tab. Pairs are grouped by source so
+each source's BFS tree is built at most once, groups are spread over a
+process pool, and one JSON result per pair is streamed to the output file.
+
+Usage: python batch.py directory pairs_file output_file [--workers N]
+"""
+
+import csv
+import json
+import multiprocessing
+import os
+import sys
+
+import degrees
+
+# Sources with at least this many targets get a full BFS tree
+TREE_THRESHOLD = 2
+
+
+def read_pairs(path):
+    """
+    Yields (line number, source, target) for every pair in path.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        for number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            delimiter = "\t" if "\t" in line else ","
+            row = next(csv.reader([line], delimiter=delimiter))
+            if len(row) != 2:
+                raise ValueError(f"{path}:{number}: expected source and target")
+            yield number, row[0].strip(), row[1].strip()
+
+
+def group_pairs(pairs):
+    """
+    Resolves every pair to person ids and groups them by source.
+
+    Returns a dict of source id -> list of (line, target id), and a list
+    of error results for pairs that could not be resolved.
+    """
+    groups = {}
+    errors = []
+    for number, source, target in pairs:
+        source_ids = degrees.person_ids_for_name(source)
+        target_ids = degrees.person_ids_for_name(target)
+        if len(source_ids) != 1 or len(target_ids) != 1:
+            unresolved = source if len(source_ids) != 1 else target
+            errors.append({
+                "line": number, "source": source, "target": target,
+                "error": f"no unique person for {unresolved}"
+            })
+            continue
+        groups.setdefault(source_ids[0], []).append((number, target_ids[0]))
+    return groups, errors
+
+
+def solve_group(group):
+    """
+    Answers every (line, target) query of one source, reusing one
+    BFS tree when the source has several targets.
+    """
+    source, queries = group
+    if len(queries) >= TREE_THRESHOLD:
+        tree = degrees.bfs_tree(source)
+        search = tree.path_to
+    else:
+        def search(target):
+            return degrees.shortest_path(source, target, bidirectional=True)
+
+    results = []
+    for number, target in queries:
+        path = search(target)
+        results.append({
+            "line": number,
+            "source": source,
+            "target": target,
+            "degrees": None if path is None else len(path),
+            "path": path,
+        })
+    return results
+
+
+def run(directory, pairs_path, output_path, workers=None):
+    """
+    Answers every pair in pairs_path and writes JSON lines to output_path.
+    Returns the number of results written.
+    """
+    if not len(degrees.people):
+        degrees.load_data(directory)
+
+    groups, errors = group_pairs(read_pairs(pairs_path))
+    written = 0
+    with open(output_path, "w", encoding="utf-8") as out:
+        for result in errors:
+            out.write(json.dumps(result) + "\n")
+            written += 1
+
+        # Forked workers share the loaded data copy-on-write; spawned
+        # workers load it again, ideally from a memory-mapped snapshot
+        with _context().Pool(workers, initializer=_init_worker,
+                             initargs=(directory,)) as pool:
+            for results in pool.imap_unordered(
+                solve_group, groups.items(), chunksize=16
+            ):
+                for result in results:
+                    out.write(json.dumps(result) + "\n")
+                written += len(results)
+    return written
+
+
+def _context():
+    """Prefers fork so workers inherit the loaded graph."""
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+def _init_worker(directory):
+    if not len(degrees.people):
+        degrees.load_data(directory)
+
+
+def main():
+    args = sys.argv[1:]
+    workers = None
+    if "--workers" in args:
+        i = args.index("--workers")
+        try:
+            workers = int(args[i + 1])
+        except (IndexError, ValueError):
+            sys.exit("Usage: python batch.py directory pairs_file output_file [--workers N]")
+        del args[i:i + 2]
+    if len(args) != 3:
+        sys.exit("Usage: python batch.py directory pairs_file output_file [--workers N]")
+    directory, pairs_path, output_path = args
+
+    print("Loading data...")
+    degrees.load_data(directory)
+    print("Data loaded.")
+    written = run(directory, pairs_path, output_path, workers or os.cpu_count())
+    print(f"{written} results written to {output_path}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Benchmark degrees searches and frontiers on synthetic IMDb-like graphs.
+
+Generates people, movies and stars CSVs with skewed actor popularity
+and a configurable cast-size distribution, then times every frontier
+and search variant on random queries at each graph size.
+
+Usage: python benchmark.py [--sizes 1000,10000] [--queries N] [--cast N] [--seed N]
+"""
+
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+import degrees
+from util import Node, SearchStats, StackFrontier, QueueFrontier, PriorityFrontier
+
+
+def generate(directory, people=10000, movies=None, cast_mean=6.0,
+             popularity=0.8, seed=0):
+    """
+    Writes people.csv, movies.csv and stars.csv for a synthetic dataset.
+
+    Cast sizes are exponentially distributed around cast_mean, and the
+    person of popularity rank r is cast with weight (r + 1) ** -popularity,
+    so a few people star in many movies, like in the real data.
+    """
+    rng = random.Random(seed)
+    if movies is None:
+        movies = max(1, people // 5)
+
+    with open(os.path.join(directory, "people.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "birth"])
+        for i in range(people):
+            writer.writerow([i + 1, f"Person {i + 1}", rng.randint(1920, 2005)])
+
+    with open(os.path.join(directory, "movies.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "title", "year"])
+        for i in range(movies):
+            writer.writerow([i + 1, f"Movie {i + 1}", rng.randint(1940, 2024)])
+
+    weights = []
+    total = 0.0
+    for rank in range(people):
+        total += (rank + 1) ** -popularity
+        weights.append(total)
+
+    with open(os.path.join(directory, "stars.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["person_id", "movie_id"])
+        for movie in range(movies):
+            size = min(people, max(1, round(rng.expovariate(1 / cast_mean))))
+            cast = set(rng.choices(range(people), cum_weights=weights, k=size))
+            for person in cast:
+                writer.writerow([person + 1, movie + 1])
+
+
+class ListQueueFrontier():
+    """The original list-slicing queue frontier, kept as a baseline."""
+
+    def __init__(self):
+        self.frontier = []
+
+    def add(self, node):
+        self.frontier.append(node)
+
+    def contains_person(self, person):
+        return any(node.person == person for node in self.frontier)
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        node = self.frontier[0]
+        self.frontier = self.frontier[1:]
+        return node
+
+
+def bench_frontiers(size):
+    """
+    Times a BFS-like workload on every frontier: size adds, each
+    preceded by a membership check, then removal of every node.
+    Returns a list of (name, seconds).
+    """
+    results = []
+    variants = [
+        ("ListQueueFrontier", ListQueueFrontier),
+        ("QueueFrontier", QueueFrontier),
+        ("StackFrontier", StackFrontier),
+        ("PriorityFrontier", PriorityFrontier),
+    ]
+    for name, frontier_class in variants:
+        frontier = frontier_class()
+        start = time.perf_counter()
+        for i in range(size):
+            if not frontier.contains_person(i):
+                frontier.add(Node(person=i, parent=None, movie=None))
+        while not frontier.empty():
+            frontier.remove()
+        results.append((name, time.perf_counter() - start))
+    return results
+
+
+def bench_searches(directory, queries, seed):
+    """
+    Loads directory in every storage mode and runs every search variant
+    on the same random queries.
+    Returns a list of (name, load seconds, mean SearchStats).
+    """
+    results = []
+    for compact in (False, True):
+        start = time.perf_counter()
+        degrees.load_data(directory, compact=compact)
+        load_time = time.perf_counter() - start
+        mode = "compact" if compact else "dict"
+
+        rng = random.Random(seed)
+        person_ids = list(degrees.people)
+        pairs = [(rng.choice(person_ids), rng.choice(person_ids))
+                 for _ in range(queries)]
+
+        start = time.perf_counter()
+        degrees.build_landmarks(8)
+        landmark_time = time.perf_counter() - start
+
+        variants = [
+            ("bfs", lambda s, t, stats: degrees.shortest_path(s, t, stats=stats)),
+            ("bidirectional", lambda s, t, stats: degrees.shortest_path(
+                s, t, bidirectional=True, stats=stats)),
+            ("astar", lambda s, t, stats: degrees.astar_shortest_path(
+                s, t, stats=stats)),
+        ]
+        for name, search in variants:
+            total = SearchStats()
+            for source, target in pairs:
+                stats = SearchStats()
+                search(source, target, stats)
+                total.nodes_expanded += stats.nodes_expanded
+                total.peak_frontier += stats.peak_frontier
+                total.neighbor_expansions += stats.neighbor_expansions
+                total.wall_time += stats.wall_time
+            setup = load_time + (landmark_time if name == "astar" else 0)
+            results.append((f"{mode}/{name}", setup, _mean(total, len(pairs))))
+    return results
+
+
+def _mean(total, count):
+    mean = SearchStats()
+    if count:
+        mean.nodes_expanded = total.nodes_expanded / count
+        mean.peak_frontier = total.peak_frontier / count
+        mean.neighbor_expansions = total.neighbor_expansions / count
+        mean.wall_time = total.wall_time / count
+    return mean
+
+
+def main():
+    args = sys.argv[1:]
+    options = {"--sizes": "1000,10000", "--queries": "50", "--cast": "6", "--seed": "0"}
+    while args:
+        if args[0] not in options or len(args) < 2:
+            sys.exit("Usage: python benchmark.py [--sizes 1000,10000] "
+                     "[--queries N] [--cast N] [--seed N]")
+        options[args[0]] = args[1]
+        args = args[2:]
+    sizes = [int(size) for size in options["--sizes"].split(",")]
+    queries = int(options["--queries"])
+    cast_mean = float(options["--cast"])
+    seed = int(options["--seed"])
+
+    for size in sizes:
+        print(f"== {size} people ==")
+        for name, seconds in bench_frontiers(size):
+            print(f"  frontier {name:<20} {seconds * 1000:10.2f} ms")
+
+        with tempfile.TemporaryDirectory() as directory:
+            generate(directory, people=size, cast_mean=cast_mean, seed=seed)
+            print(f"  {'search':<22} {'setup s':>8} {'ms/query':>9} "
+                  f"{'expanded':>9} {'peak':>8} {'neighbors':>10}")
+            for name, setup, stats in bench_searches(directory, queries, seed):
+                print(f"  {name:<22} {setup:8.2f} {stats.wall_time * 1000:9.3f} "
+                      f"{stats.nodes_expanded:9.1f} {stats.peak_frontier:8.1f} "
+                      f"{stats.neighbor_expansions:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+from collections import OrderedDict
+
+import degrees
+
+
+class LRUCache():
+    """
+    Mapping of at most maxsize entries that evicts the least recently
+    used entry when full.
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key, default=None):
+        if key not in self.entries:
+            return default
+        self.entries.move_to_end(key)
+        return self.entries[key]
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def discard(self, key):
+        self.entries.pop(key, None)
+
+    def keys(self):
+        return list(self.entries)
+
+    def clear(self):
+        self.entries.clear()
+
+
+class PathCache():
+    """
+    Answers shortest path queries for degrees.py, caching recent paths
+    by (source, target) and full BFS trees by source.
+
+    A source gets a BFS tree once it has been queried tree_threshold
+    times; until then, queries run a bidirectional search.
+    """
+
+    def __init__(self, max_paths=4096, max_trees=16, tree_threshold=2):
+        self.paths = LRUCache(max_paths)
+        self.trees = LRUCache(max_trees)
+        self.tree_threshold = tree_threshold
+
+        # Recent query counts by source, to spot popular sources
+        self.counts = LRUCache(max_paths)
+
+        self.hits = 0
+        self.misses = 0
+
+        # Hear about dataset updates (see degrees.add_star)
+        degrees.caches.add(self)
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target, or None.
+        """
+        key = (source, target)
+        if key in self.paths:
+            self.hits += 1
+            return self.paths.get(key)
+
+        tree = self.tree(source, build=False)
+        if tree is not None:
+            self.hits += 1
+            path = tree.path_to(target)
+        else:
+            self.misses += 1
+            count = self.counts.get(source, 0) + 1
+            self.counts.put(source, count)
+            if count >= self.tree_threshold:
+                path = self.tree(source).path_to(target)
+            else:
+                path = degrees.shortest_path(source, target, bidirectional=True)
+
+        self.paths.put(key, path)
+        return path
+
+    def tree(self, source, build=True):
+        """
+        Returns the cached BFS tree for source, building it if needed
+        (or returning None if build is False).
+        """
+        tree = self.trees.get(source)
+        if tree is None and build:
+            tree = degrees.bfs_tree(source)
+            self.trees.put(source, tree)
+        return tree
+
+    def invalidate(self, person_ids):
+        """
+        Drops everything a new connection between person_ids could change.
+
+        A cached tree that reaches none of them covers a component the
+        update did not touch, so it and the paths from its source stay.
+        Every other cached path may now be shorter and is dropped.
+        """
+        for source in self.trees.keys():
+            tree = self.trees.get(source)
+            if any(person_id in tree for person_id in person_ids):
+                self.trees.discard(source)
+        for key in self.paths.keys():
+            if key[0] not in self.trees:
+                self.paths.discard(key)
+
+    def clear(self):
+        self.paths.clear()
+        self.trees.clear()
+        self.counts.clear()
@@ -1,7 +1,15 @@
 import csv
+import math
+import os
 import sys
+import weakref
 
-from util import Node, StackFrontier, QueueFrontier
+import landmarks as alt
+import snapshot
+from names import NameIndex
+from graph import CompactGraph, PeopleView, MoviesView, NamesView
+from util import Node, SearchStats, SearchTree, timed
+from util import StackFrontier, QueueFrontier, PriorityFrontier
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,11 +20,59 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# CompactGraph backing the three mappings above, if loaded in compact mode
+graph = None
 
-def load_data(directory):
+# LandmarkIndex over people, if built or found next to the data files
+landmarks = None
+
+# NameIndex for prefix and fuzzy name search, built on first search
+name_index = None
+
+# Caches of search results, told which people an update touches
+# through their invalidate(person_ids) method
+caches = weakref.WeakSet()
+
+
+def load_data(directory, compact=False):
     """
     Load data from CSV files into memory.
+
+    If compact is True, the data is stored in a CompactGraph and
+    names, people and movies become read-only views over it.
+    A snapshot newer than the CSVs (see snapshot.py) is always
+    memory-mapped in compact mode instead of parsing the CSVs.
+
+    A landmark index newer than the CSVs (see landmarks.py) is
+    loaded as well.
     """
+    global landmarks, name_index
+    landmarks = None
+    name_index = None
+    if snapshot.is_fresh(directory):
+        load_graph(snapshot.load_snapshot(snapshot.snapshot_path(directory)))
+    elif compact:
+        load_graph(CompactGraph.from_csv(directory))
+    else:
+        _load_csv(directory)
+
+    if snapshot.is_fresh(directory, alt.FILENAME):
+        landmarks = alt.LandmarkIndex.load(
+            snapshot.snapshot_path(directory, alt.FILENAME), _positions()
+        )
+        if landmarks.distances and len(landmarks.distances[0]) != len(people):
+            landmarks = None
+
+
+def _load_csv(directory):
+    """
+    Load the CSV files into fresh names, people and movies dicts.
+    """
+    global graph, names, people, movies
+    graph = None
+    names, people, movies = {}, {}, {}
+
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
@@ -52,6 +108,169 @@ def load_data(directory):
                 pass
 
 
+def load_graph(compact_graph):
+    """
+    Makes compact_graph the backing store for names, people and movies.
+    """
+    global graph, names, people, movies
+    graph = compact_graph
+    names = NamesView(graph)
+    people = PeopleView(graph)
+    movies = MoviesView(graph)
+
+
+def add_person(person_id, name, birth):
+    """
+    Adds a person to the loaded data.
+    """
+    if person_id in people:
+        raise ValueError(f"person {person_id} already exists")
+    if graph is not None:
+        graph.add_person(person_id, name, birth)
+    else:
+        people[person_id] = {"name": name, "birth": birth, "movies": set()}
+        names.setdefault(name.lower(), set()).add(person_id)
+    _data_changed(set())
+
+
+def add_movie(movie_id, title, year):
+    """
+    Adds a movie to the loaded data.
+    """
+    if movie_id in movies:
+        raise ValueError(f"movie {movie_id} already exists")
+    if graph is not None:
+        graph.add_movie(movie_id, title, year)
+    else:
+        movies[movie_id] = {"title": title, "year": year, "stars": set()}
+    _data_changed(set())
+
+
+def add_star(person_id, movie_id):
+    """
+    Records that a person starred in a movie, invalidating any cached
+    search that the new connection could shorten.
+    Returns False if the person already starred in the movie.
+    Raises KeyError if either is unknown.
+    """
+    if graph is not None:
+        p = graph.person_index[person_id]
+        m = graph.movie_index[movie_id]
+        touched = {graph.person_ids[q] for q in graph.stars_of(m)}
+        if not graph.add_star(p, m):
+            return False
+    else:
+        person = people[person_id]
+        movie = movies[movie_id]
+        if movie_id in person["movies"]:
+            return False
+        touched = set(movie["stars"])
+        person["movies"].add(movie_id)
+        movie["stars"].add(person_id)
+    touched.add(person_id)
+    _data_changed(touched)
+    return True
+
+
+def apply_delta(directory):
+    """
+    Adds the rows of any people.csv, movies.csv and stars.csv in
+    directory to the loaded data, skipping people and movies that
+    already exist and stars naming unknown ids, like load_data.
+    Returns the number of rows added.
+    """
+    added = 0
+    path = os.path.join(directory, "people.csv")
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                if row["id"] not in people:
+                    add_person(row["id"], row["name"], row["birth"])
+                    added += 1
+
+    path = os.path.join(directory, "movies.csv")
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                if row["id"] not in movies:
+                    add_movie(row["id"], row["title"], row["year"])
+                    added += 1
+
+    path = os.path.join(directory, "stars.csv")
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                try:
+                    if add_star(row["person_id"], row["movie_id"]):
+                        added += 1
+                except KeyError:
+                    pass
+    return added
+
+
+def _data_changed(person_ids):
+    """
+    Drops derived indexes after an update and tells every registered
+    cache which people gained connections.
+    """
+    global landmarks, name_index
+
+    # New edges can shorten distances, which would make landmark
+    # bounds inadmissible, and new people are missing from the tables
+    landmarks = None
+    name_index = None
+    if person_ids:
+        for cache in list(caches):
+            cache.invalidate(person_ids)
+
+
+def build_landmarks(k=16):
+    """
+    Builds a LandmarkIndex of k landmarks over the loaded data and
+    makes it the index used by estimate_degrees and astar_shortest_path.
+    """
+    global landmarks
+    positions = _positions()
+    if graph is not None:
+        def neighbors(p):
+            return (q for _, q in graph.neighbors(p))
+
+        def degree(p):
+            return len(graph.movies_of(p))
+    else:
+        person_ids = list(people)
+
+        def neighbors(i):
+            return (positions[person_id]
+                    for _, person_id in neighbors_for_person(person_ids[i]))
+
+        def degree(i):
+            return len(people[person_ids[i]]["movies"])
+
+    landmarks = alt.LandmarkIndex.build(
+        list(people), positions, neighbors, degree, k
+    )
+    return landmarks
+
+
+def _positions():
+    """Maps person_ids to their position in the people table."""
+    if graph is not None:
+        return graph.person_index
+    return {person_id: i for i, person_id in enumerate(people)}
+
+
+def estimate_degrees(source, target):
+    """
+    Returns (lower, upper) bounds on the degrees of separation between
+    two people from the landmark index, without searching.
+    lower is math.inf if they are not connected, upper is None if unknown.
+    """
+    if landmarks is None:
+        raise Exception("no landmark index loaded")
+    return landmarks.bounds(source, target)
+
+
 def main():
     if len(sys.argv) > 2:
         sys.exit("Usage: python degrees.py [directory]")
@@ -70,7 +289,7 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    path = shortest_path(source, target, bidirectional=True)
 
     if path is None:
         print("Not connected.")
@@ -85,14 +304,27 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+@timed
+def shortest_path(source, target, bidirectional=False, stats=None):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
-    
+
+    If bidirectional is True, searches from both ends at once
+    (see bidirectional_shortest_path). If stats is a SearchStats,
+    it is filled in with counters for this search.
+
     If no possible path, returns None.
     """
-    steps = 0
+    if stats is None:
+        stats = SearchStats()
+    if graph is not None:
+        return _graph_shortest_path(source, target, bidirectional, stats)
+    if bidirectional:
+        return bidirectional_shortest_path(source, target, stats=stats)
+
+    if source == target:
+        return []
 
     # Init node and frontier
     start = Node(person=source, parent=None,movie=None)
@@ -109,40 +341,234 @@ def shortest_path(source, target):
     
         # Get node
         node = frontier.remove()
-        steps += 1
+        stats.nodes_expanded += 1
 
-        # If solution was found
-        if node.person == target:
-            person_id = []
-            movie_id = []
-            while node.parent is not None:
-                person_id.append(node.person)
-                movie_id.append(node.movie)
-                node = node.parent
-            person_id.reverse()
-            movie_id.reverse()
-            solution = [(movie_id, person_id) for movie_id,person_id in zip(movie_id, person_id)]
-            return solution
-        
-        # If the solution is not found, add the current node to explored
+        # Add the current node to explored
         explored.add(node.person)
 
         # Add people that starred with the source to the frontier in order to reach the target
         for movie, person in neighbors_for_person(node.person):
+            stats.neighbor_expansions += 1
             if not frontier.contains_person(person) and person not in explored:
                 child = Node(person=person, parent=node, movie=movie)
+
+                # If solution was found, as early as the target is reached,
+                # like the compact graph's search
+                if person == target:
+                    return _solution(child)
                 frontier.add(child)
+        stats.peak_frontier = max(stats.peak_frontier, len(frontier))
 
 
-def person_id_for_name(name):
+def _solution(node):
+    """
+    Returns the (movie_id, person_id) pairs on the path to node.
+    """
+    person_id = []
+    movie_id = []
+    while node.parent is not None:
+        person_id.append(node.person)
+        movie_id.append(node.movie)
+        node = node.parent
+    person_id.reverse()
+    movie_id.reverse()
+    return [(movie_id, person_id) for movie_id,person_id in zip(movie_id, person_id)]
+
+
+def bfs_tree(source):
+    """
+    Returns a SearchTree holding a shortest path from source
+    to every person connected to them.
+    """
+    if graph is not None:
+        return SearchTree(source, graph.bfs_tree(graph.person_index[source]))
+
+    parents = {source: None}
+    layer = [source]
+    while layer:
+        next_layer = []
+        for person_id in layer:
+            for movie_id, neighbor in neighbors_for_person(person_id):
+                if neighbor not in parents:
+                    parents[neighbor] = (movie_id, person_id)
+                    next_layer.append(neighbor)
+        layer = next_layer
+    return SearchTree(source, parents)
+
+
+def _graph_shortest_path(source, target, bidirectional, stats):
+    """
+    Runs the search over the interned ints of the compact graph and
+    translates the path back to (movie_id, person_id) pairs.
+    """
+    path = graph.shortest_path(
+        graph.person_index[source], graph.person_index[target],
+        bidirectional, stats
+    )
+    if path is None:
+        return None
+    return [(graph.movie_ids[m], graph.person_ids[p]) for m, p in path]
+
+
+@timed
+def bidirectional_shortest_path(source, target, stats=None):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, growing one breadth-first
+    frontier from the source and one from the target and always
+    expanding the smaller of the two by a full layer.
+
+    If no possible path, returns None.
+    """
+    if stats is None:
+        stats = SearchStats()
+    if source == target:
+        return []
+
+    # Maps each reached person to (movie, person) one step closer to
+    # the source (forward) or to the target (backward)
+    forward = {source: None}
+    backward = {target: None}
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    while forward_frontier and backward_frontier:
+
+        # Expand whichever side has fewer people waiting
+        if len(forward_frontier) <= len(backward_frontier):
+            forward_frontier, meeting = _expand_layer(
+                forward_frontier, forward, backward, stats
+            )
+        else:
+            backward_frontier, meeting = _expand_layer(
+                backward_frontier, backward, forward, stats
+            )
+        stats.peak_frontier = max(
+            stats.peak_frontier, len(forward_frontier) + len(backward_frontier)
+        )
+
+        if meeting is not None:
+            return _join_paths(meeting, forward, backward)
+
+    # One side ran out of people without meeting the other
+    return None
+
+
+def _expand_layer(frontier, parents, other_parents, stats):
+    """
+    Expands every person in frontier by one step, recording parents.
+    Returns the next layer and a person reached by both searches, or None.
+    """
+    next_layer = []
+    meeting = None
+    stats.nodes_expanded += len(frontier)
+    for person_id in frontier:
+        for movie_id, neighbor in neighbors_for_person(person_id):
+            stats.neighbor_expansions += 1
+            if neighbor in parents:
+                continue
+            parents[neighbor] = (movie_id, person_id)
+            next_layer.append(neighbor)
+
+            # Any meeting within this layer is equally short, keep the first
+            if meeting is None and neighbor in other_parents:
+                meeting = neighbor
+    return next_layer, meeting
+
+
+def _join_paths(meeting, forward, backward):
+    """
+    Builds the (movie_id, person_id) path through the meeting person
+    from the forward and backward parent maps.
+    """
+    # Walk from the meeting person back to the source
+    path = []
+    person_id = meeting
+    while forward[person_id] is not None:
+        movie_id, parent = forward[person_id]
+        path.append((movie_id, person_id))
+        person_id = parent
+    path.reverse()
+
+    # Walk from the meeting person on to the target
+    person_id = meeting
+    while backward[person_id] is not None:
+        movie_id, person_id = backward[person_id]
+        path.append((movie_id, person_id))
+    return path
+
+
+@timed
+def astar_shortest_path(source, target, stats=None):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, using A* search guided by
+    the landmark index.
+
+    If no possible path, returns None.
+    """
+    if landmarks is None:
+        raise Exception("no landmark index loaded")
+    if stats is None:
+        stats = SearchStats()
+    h = landmarks.heuristic(target)
+    if h(source) == math.inf:
+        return None
+
+    # Cost of the best known path to each person
+    cost = {source: 0}
+    start = Node(person=source, parent=None, movie=None)
+    frontier = PriorityFrontier()
+    frontier.add(start, h(source))
+    explored = set()
+
+    while not frontier.empty():
+        node = frontier.remove()
+        if node.person in explored:
+            continue
+        if node.person == target:
+            path = []
+            while node.parent is not None:
+                path.append((node.movie, node.person))
+                node = node.parent
+            path.reverse()
+            return path
+        explored.add(node.person)
+        stats.nodes_expanded += 1
+
+        g = cost[node.person] + 1
+        for movie, person in neighbors_for_person(node.person):
+            stats.neighbor_expansions += 1
+            if person in explored or g >= cost.get(person, math.inf):
+                continue
+            estimate = h(person)
+            if estimate == math.inf:
+                continue
+            cost[person] = g
+            frontier.add(Node(person=person, parent=node, movie=movie), g + estimate)
+        stats.peak_frontier = max(stats.peak_frontier, len(frontier))
+    return None
+
+
+def person_id_for_name(name, interactive=True):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
+
+    If interactive is False, never prompts: ambiguous names return None.
     """
     person_ids = list(names.get(name.lower(), set()))
     if len(person_ids) == 0:
+        if interactive:
+            suggestions = search_names(name, limit=5)
+            if suggestions:
+                print("Did you mean: " + ", ".join(
+                    people[ids[0]]["name"] for _, ids in suggestions
+                ) + "?")
         return None
     elif len(person_ids) > 1:
+        if not interactive:
+            return None
         print(f"Which '{name}'?")
         for person_id in person_ids:
             person = people[person_id]
@@ -160,11 +586,42 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def person_ids_for_name(name):
+    """
+    Returns the list of IMDB ids matching a name or id, without prompting.
+    """
+    if name in people:
+        return [name]
+    return sorted(names.get(name.lower(), set()))
+
+
+def search_names(query, limit=10, max_distance=2):
+    """
+    Returns up to limit ranked (lowercase name, person_ids) candidates
+    for query: exact match first, then prefix matches, then names
+    within max_distance edits.
+    """
+    global name_index
+    if name_index is None:
+        if graph is not None:
+            entries = zip(graph.person_ids, graph.person_names)
+        else:
+            entries = ((person_id, person["name"])
+                       for person_id, person in people.items())
+        name_index = NameIndex(entries)
+    return name_index.search(query, limit, max_distance)
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
+    if graph is not None:
+        p = graph.person_index[person_id]
+        return {(graph.movie_ids[m], graph.person_ids[q])
+                for m, q in graph.neighbors(p)}
+
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
@@ -0,0 +1,536 @@
+import csv
+from array import array
+from collections import ChainMap
+from collections.abc import Mapping, Sequence
+
+
+class CompactGraph():
+    """
+    Bipartite person/movie star graph with ids interned to dense ints.
+
+    Each side is stored in CSR form: the movies of person p are
+    person_movies[person_offsets[p]:person_offsets[p + 1]], and the
+    stars of movie m are movie_stars[movie_offsets[m]:movie_offsets[m + 1]].
+
+    People, movies and stars added after construction live in small
+    overlay tables until the graph is compacted.
+    """
+
+    def __init__(self, person_ids, person_names, person_births,
+                 movie_ids, movie_titles, movie_years,
+                 person_offsets, person_movies, movie_offsets, movie_stars,
+                 person_index=None, movie_index=None, name_index=None):
+        self.person_ids = person_ids
+        self.person_names = person_names
+        self.person_births = person_births
+        self.movie_ids = movie_ids
+        self.movie_titles = movie_titles
+        self.movie_years = movie_years
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_stars = movie_stars
+
+        # Indexes may be given prebuilt (e.g. by a snapshot), else build dicts
+        if person_index is None:
+            person_index = {pid: i for i, pid in enumerate(person_ids)}
+        if movie_index is None:
+            movie_index = {mid: i for i, mid in enumerate(movie_ids)}
+        if name_index is None:
+            # Maps lowercase names to a list of person indices
+            name_index = {}
+            for i, name in enumerate(person_names):
+                name_index.setdefault(name.lower(), []).append(i)
+        self.person_index = person_index
+        self.movie_index = movie_index
+        self.name_index = name_index
+
+        # Rows past the CSR arrays, and edges added after construction
+        self.base_people = len(person_ids)
+        self.base_movies = len(movie_ids)
+        self.extra_movies = {}
+        self.extra_stars = {}
+
+    @classmethod
+    def from_csv(cls, directory):
+        """
+        Builds a graph straight from people.csv, movies.csv and stars.csv,
+        without going through the dict-of-sets representation.
+        """
+        person_ids, person_names, person_births = [], [], []
+        with open(f"{directory}/people.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                person_ids.append(row["id"])
+                person_names.append(row["name"])
+                person_births.append(row["birth"])
+
+        movie_ids, movie_titles, movie_years = [], [], []
+        with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                movie_ids.append(row["id"])
+                movie_titles.append(row["title"])
+                movie_years.append(row["year"])
+
+        person_index = {pid: i for i, pid in enumerate(person_ids)}
+        movie_index = {mid: i for i, mid in enumerate(movie_ids)}
+
+        # Collect each (person, movie) edge once, skipping unknown ids
+        edges = set()
+        with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                try:
+                    p = person_index[row["person_id"]]
+                    m = movie_index[row["movie_id"]]
+                except KeyError:
+                    continue
+                edges.add((p, m))
+
+        return cls.from_edges(
+            person_ids, person_names, person_births,
+            movie_ids, movie_titles, movie_years, sorted(edges)
+        )
+
+    @classmethod
+    def from_dicts(cls, people, movies):
+        """
+        Builds a graph from the people and movies dicts used by degrees.py.
+        """
+        person_ids = list(people)
+        movie_ids = list(movies)
+        movie_index = {mid: i for i, mid in enumerate(movie_ids)}
+        edges = []
+        for p, person_id in enumerate(person_ids):
+            for movie_id in people[person_id]["movies"]:
+                edges.append((p, movie_index[movie_id]))
+        edges.sort()
+
+        return cls.from_edges(
+            person_ids,
+            [people[pid]["name"] for pid in person_ids],
+            [people[pid]["birth"] for pid in person_ids],
+            movie_ids,
+            [movies[mid]["title"] for mid in movie_ids],
+            [movies[mid]["year"] for mid in movie_ids],
+            edges
+        )
+
+    @classmethod
+    def from_edges(cls, person_ids, person_names, person_births,
+                   movie_ids, movie_titles, movie_years, edges):
+        """
+        Builds a graph from id/attribute tables and a list of distinct
+        (person index, movie index) edges.
+        """
+        person_offsets, person_movies = _csr(
+            len(person_ids), ((p, m) for p, m in edges), len(edges)
+        )
+        movie_offsets, movie_stars = _csr(
+            len(movie_ids), ((m, p) for p, m in edges), len(edges)
+        )
+        return cls(
+            person_ids, person_names, person_births,
+            movie_ids, movie_titles, movie_years,
+            person_offsets, person_movies, movie_offsets, movie_stars
+        )
+
+    def __len__(self):
+        return len(self.person_ids)
+
+    def movies_of(self, p):
+        """Returns the movie indices person p starred in."""
+        if p < self.base_people:
+            movies = self.person_movies[self.person_offsets[p]:self.person_offsets[p + 1]]
+        else:
+            movies = ()
+        if p in self.extra_movies:
+            return list(movies) + self.extra_movies[p]
+        return movies
+
+    def stars_of(self, m):
+        """Returns the person indices who starred in movie m."""
+        if m < self.base_movies:
+            stars = self.movie_stars[self.movie_offsets[m]:self.movie_offsets[m + 1]]
+        else:
+            stars = ()
+        if m in self.extra_stars:
+            return list(stars) + self.extra_stars[m]
+        return stars
+
+    def neighbors(self, p):
+        """
+        Yields (movie index, person index) pairs for people who starred
+        with person p, including p itself.
+        """
+        if self.extra_movies or p >= self.base_people:
+            for m in self.movies_of(p):
+                for q in self.stars_of(m):
+                    yield m, q
+            return
+
+        person_offsets = self.person_offsets
+        movie_offsets = self.movie_offsets
+        movie_stars = self.movie_stars
+        for m in self.person_movies[person_offsets[p]:person_offsets[p + 1]]:
+            for q in movie_stars[movie_offsets[m]:movie_offsets[m + 1]]:
+                yield m, q
+
+    def add_person(self, person_id, name, birth):
+        """
+        Appends a person and returns their index.
+        """
+        if person_id in self.person_index:
+            raise ValueError(f"person {person_id} already exists")
+        self._make_appendable()
+        p = len(self.person_ids)
+        self.person_ids.append(person_id)
+        self.person_names.append(name)
+        self.person_births.append(birth)
+        self.person_index[person_id] = p
+        self.name_index[name.lower()] = list(self.name_index.get(name.lower(), [])) + [p]
+        return p
+
+    def add_movie(self, movie_id, title, year):
+        """
+        Appends a movie and returns its index.
+        """
+        if movie_id in self.movie_index:
+            raise ValueError(f"movie {movie_id} already exists")
+        self._make_appendable()
+        m = len(self.movie_ids)
+        self.movie_ids.append(movie_id)
+        self.movie_titles.append(title)
+        self.movie_years.append(year)
+        self.movie_index[movie_id] = m
+        return m
+
+    def add_star(self, p, m):
+        """
+        Records that person index p starred in movie index m.
+        Returns False if the edge was already present.
+        """
+        if m in self.movies_of(p):
+            return False
+        self.extra_movies.setdefault(p, []).append(m)
+        self.extra_stars.setdefault(m, []).append(p)
+        return True
+
+    def edges(self):
+        """Yields every (person index, movie index) edge."""
+        for p in range(len(self)):
+            for m in self.movies_of(p):
+                yield p, m
+
+    def compacted(self):
+        """
+        Returns a graph with every appended row folded into the CSR
+        arrays, or self if nothing was appended.
+        """
+        if (len(self.person_ids) == self.base_people
+                and len(self.movie_ids) == self.base_movies
+                and not self.extra_movies):
+            return self
+        return CompactGraph.from_edges(
+            list(self.person_ids), list(self.person_names),
+            list(self.person_births), list(self.movie_ids),
+            list(self.movie_titles), list(self.movie_years),
+            sorted(self.edges())
+        )
+
+    def _make_appendable(self):
+        """
+        Wraps read-only tables and indexes (e.g. from a snapshot)
+        so rows can be appended to them.
+        """
+        for name in ("person_ids", "person_names", "person_births",
+                     "movie_ids", "movie_titles", "movie_years"):
+            table = getattr(self, name)
+            if not isinstance(table, (list, Extended)):
+                setattr(self, name, Extended(table))
+        for name in ("person_index", "movie_index", "name_index"):
+            index = getattr(self, name)
+            if not isinstance(index, (dict, ChainMap)):
+                setattr(self, name, ChainMap({}, index))
+
+    def shortest_path(self, source, target, bidirectional=False, stats=None):
+        """
+        Returns the shortest list of (movie index, person index) pairs
+        that connect person index source to target, or None.
+
+        If stats is a util.SearchStats, its counters are filled in.
+        """
+        if source == target:
+            return []
+        if bidirectional:
+            return self._bidirectional_path(source, target, stats)
+
+        parent, via, _ = self._bfs(source, target, stats)
+        if parent[target] == -1:
+            return None
+        return self._walk(target, source, parent, via)
+
+    def bfs_tree(self, source):
+        """
+        Runs a full breadth-first search from person index source.
+        Returns a TreeView of (movie_id, parent_id) links for every
+        reachable person.
+        """
+        parent, via, count = self._bfs(source)
+        return TreeView(self, source, parent, via, count)
+
+    def _bfs(self, source, target=None, stats=None):
+        """
+        Breadth-first search from source, stopping early at target if given.
+        Returns the parent person and movie arrays (-1 if unreached) and
+        the number of people reached.
+        """
+        parent = array("q", [-1]) * len(self)
+        via = array("q", [-1]) * len(self)
+        parent[source] = source
+        count = 1
+
+        # Counted in locals to keep the inner loop cheap
+        expanded = examined = peak = 0
+
+        def done():
+            if stats is not None:
+                stats.nodes_expanded += expanded
+                stats.neighbor_expansions += examined
+                stats.peak_frontier = max(stats.peak_frontier, peak)
+            return parent, via, count
+
+        layer = [source]
+        while layer:
+            next_layer = []
+            for i, p in enumerate(layer):
+                expanded += 1
+                for m, q in self.neighbors(p):
+                    examined += 1
+                    if parent[q] != -1:
+                        continue
+                    parent[q] = p
+                    via[q] = m
+                    count += 1
+                    if q == target:
+                        return done()
+                    next_layer.append(q)
+
+                # Waiting: the rest of this layer and all of the next,
+                # as in the queue of the dict search
+                peak = max(peak, len(layer) - i - 1 + len(next_layer))
+            layer = next_layer
+        return done()
+
+    def _bidirectional_path(self, source, target, stats=None):
+        """
+        Grows one frontier from each end, always expanding the smaller,
+        until they meet.
+        """
+        forward = {source: None}
+        backward = {target: None}
+        forward_layer = [source]
+        backward_layer = [target]
+
+        while forward_layer and backward_layer:
+            if len(forward_layer) <= len(backward_layer):
+                layer, parents, other = forward_layer, forward, backward
+            else:
+                layer, parents, other = backward_layer, backward, forward
+
+            next_layer = []
+            meeting = None
+            if stats is not None:
+                stats.nodes_expanded += len(layer)
+            for p in layer:
+                for m, q in self.neighbors(p):
+                    if stats is not None:
+                        stats.neighbor_expansions += 1
+                    if q in parents:
+                        continue
+                    parents[q] = (m, p)
+                    next_layer.append(q)
+                    if meeting is None and q in other:
+                        meeting = q
+
+            if parents is forward:
+                forward_layer = next_layer
+            else:
+                backward_layer = next_layer
+            if stats is not None:
+                stats.peak_frontier = max(
+                    stats.peak_frontier, len(forward_layer) + len(backward_layer)
+                )
+
+            if meeting is not None:
+                path = []
+                p = meeting
+                while forward[p] is not None:
+                    m, parent = forward[p]
+                    path.append((m, p))
+                    p = parent
+                path.reverse()
+                p = meeting
+                while backward[p] is not None:
+                    m, p = backward[p]
+                    path.append((m, p))
+                return path
+        return None
+
+    @staticmethod
+    def _walk(p, source, parent, via):
+        """Follows parent links from p back to source into a path."""
+        path = []
+        while p != source:
+            path.append((via[p], p))
+            p = parent[p]
+        path.reverse()
+        return path
+
+
+class Extended(Sequence):
+    """
+    Read-only sequence with an appendable list of extra items after it.
+    """
+
+    def __init__(self, base):
+        self.base = base
+        self.extra = []
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if i < len(self.base):
+            return self.base[i]
+        return self.extra[i - len(self.base)]
+
+    def __len__(self):
+        return len(self.base) + len(self.extra)
+
+    def append(self, item):
+        self.extra.append(item)
+
+
+class TreeView(Mapping):
+    """
+    Read-only view of a breadth-first tree over a CompactGraph:
+    person_id -> (movie_id, parent person_id), or None for the source.
+    """
+
+    def __init__(self, graph, source, parent, via, count):
+        self.graph = graph
+        self.source = source
+        self.parent = parent
+        self.via = via
+        self.count = count
+
+    def __getitem__(self, person_id):
+        graph = self.graph
+        p = graph.person_index.get(person_id)
+        if p is None or p >= len(self.parent) or self.parent[p] == -1:
+            raise KeyError(person_id)
+        if p == self.source:
+            return None
+        return graph.movie_ids[self.via[p]], graph.person_ids[self.parent[p]]
+
+    def __iter__(self):
+        person_ids = self.graph.person_ids
+        for p, parent in enumerate(self.parent):
+            if parent != -1:
+                yield person_ids[p]
+
+    def __len__(self):
+        return self.count
+
+
+class PeopleView(Mapping):
+    """
+    Read-only people mapping over a CompactGraph, in the same shape as
+    degrees.people: person_id -> {name, birth, movies}.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, person_id):
+        graph = self.graph
+        p = graph.person_index[person_id]
+        return {
+            "name": graph.person_names[p],
+            "birth": graph.person_births[p],
+            "movies": {graph.movie_ids[m] for m in graph.movies_of(p)}
+        }
+
+    def __iter__(self):
+        return iter(self.graph.person_ids)
+
+    def __len__(self):
+        return len(self.graph.person_ids)
+
+
+class MoviesView(Mapping):
+    """
+    Read-only movies mapping over a CompactGraph, in the same shape as
+    degrees.movies: movie_id -> {title, year, stars}.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, movie_id):
+        graph = self.graph
+        m = graph.movie_index[movie_id]
+        return {
+            "title": graph.movie_titles[m],
+            "year": graph.movie_years[m],
+            "stars": {graph.person_ids[p] for p in graph.stars_of(m)}
+        }
+
+    def __iter__(self):
+        return iter(self.graph.movie_ids)
+
+    def __len__(self):
+        return len(self.graph.movie_ids)
+
+
+class NamesView(Mapping):
+    """
+    Read-only names mapping over a CompactGraph, in the same shape as
+    degrees.names: lowercase name -> set of person_ids.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, name):
+        person_ids = self.graph.person_ids
+        return {person_ids[p] for p in self.graph.name_index[name]}
+
+    def __iter__(self):
+        return iter(self.graph.name_index)
+
+    def __len__(self):
+        return len(self.graph.name_index)
+
+
+def _csr(rows, pairs, count):
+    """
+    Builds CSR (offsets, indices) arrays for rows from count
+    (row, column) pairs, keeping columns in the order given.
+    """
+    pairs = list(pairs)
+
+    # Count entries per row, then turn the counts into start offsets
+    offsets = array("q", [0]) * (rows + 1)
+    for row, _ in pairs:
+        offsets[row + 1] += 1
+    for row in range(rows):
+        offsets[row + 1] += offsets[row]
+
+    # Place each column at the next free slot of its row
+    indices = array("q", [0]) * count
+    cursor = array("q", offsets[:-1])
+    for row, column in pairs:
+        indices[cursor[row]] = column
+        cursor[row] += 1
+    return offsets, indices
@@ -0,0 +1,190 @@
+"""
+Landmark (ALT) distance index for degrees.
+
+Stores breadth-first distances from k landmark people to every person.
+By the triangle inequality, |d(L, s) - d(L, t)| <= d(s, t) <= d(L, s) + d(L, t)
+for every landmark L, which bounds degrees of separation without searching
+and gives A* an admissible heuristic.
+
+Usage: python landmarks.py [directory] [k]
+"""
+
+import math
+import mmap
+import struct
+import sys
+
+FILENAME = "landmarks.bin"
+MAGIC = b"DEGLMK01"
+
+# Distance stored for people a landmark cannot reach
+UNREACHABLE = 255
+
+
+class LandmarkIndex():
+    """
+    BFS distances from each landmark, one byte per person, where
+    positions maps a person_id to its position in every distance table.
+    """
+
+    def __init__(self, landmarks, distances, positions):
+        self.landmarks = landmarks
+        self.distances = distances
+        self.positions = positions
+
+    @classmethod
+    def build(cls, person_ids, positions, neighbors, degree, k=16):
+        """
+        Picks k landmarks and computes their distance tables.
+
+        neighbors(i) yields the positions of people who starred with
+        the person at position i, and degree(i) is their movie count.
+        The first landmark is the best-connected person; each next one
+        is the person farthest from every landmark picked so far,
+        within the landmarks' connected components.
+        """
+        count = len(person_ids)
+        landmarks = []
+        distances = []
+        if count == 0:
+            return cls(landmarks, distances, positions)
+
+        # Distance to the nearest landmark so far
+        nearest = bytearray([UNREACHABLE]) * count
+        candidate = max(range(count), key=degree)
+        while len(landmarks) < min(k, count):
+            table = distances_from(candidate, count, neighbors)
+            landmarks.append(person_ids[candidate])
+            distances.append(table)
+            for i in range(count):
+                if table[i] < nearest[i]:
+                    nearest[i] = table[i]
+
+            # Next, the reachable person farthest from every landmark
+            candidate = max(
+                range(count),
+                key=lambda i: -1 if nearest[i] == UNREACHABLE else nearest[i]
+            )
+            if nearest[candidate] in (0, UNREACHABLE):
+                break
+
+        return cls(landmarks, distances, positions)
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper) bounds on the degrees of separation of
+        two person_ids. lower is math.inf if they are known to be
+        disconnected; upper is None if no landmark reaches both.
+        """
+        s = self.positions[source]
+        t = self.positions[target]
+        if s == t:
+            return 0, 0
+        lower = 0
+        upper = None
+        for table in self.distances:
+            ds, dt = table[s], table[t]
+            if ds == UNREACHABLE and dt == UNREACHABLE:
+                continue
+            if ds == UNREACHABLE or dt == UNREACHABLE:
+                return math.inf, None
+            lower = max(lower, abs(ds - dt))
+            if upper is None or ds + dt < upper:
+                upper = ds + dt
+        return lower, upper
+
+    def heuristic(self, target):
+        """
+        Returns h(person_id), a lower bound on the distance from
+        person_id to target (math.inf if they are disconnected).
+        """
+        t = self.positions[target]
+        targets = [(table, table[t]) for table in self.distances]
+
+        def h(person_id):
+            i = self.positions[person_id]
+            best = 0
+            for table, dt in targets:
+                di = table[i]
+                if di == UNREACHABLE or dt == UNREACHABLE:
+                    if di != dt:
+                        return math.inf
+                    continue
+                if abs(di - dt) > best:
+                    best = abs(di - dt)
+            return best
+        return h
+
+    def save(self, path):
+        """Writes the index to path."""
+        count = len(self.distances[0]) if self.distances else 0
+        header = "\n".join(self.landmarks).encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<QQQ", len(self.landmarks), count, len(header)))
+            f.write(header)
+            for table in self.distances:
+                f.write(table)
+
+    @classmethod
+    def load(cls, path, positions):
+        """
+        Memory-maps the index at path, using positions to look up people.
+        """
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(buffer)
+        if bytes(view[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path} is not a landmark index")
+        k, count, header_size = struct.unpack_from("<QQQ", view, len(MAGIC))
+        start = len(MAGIC) + 24
+        header = str(view[start:start + header_size], "utf-8")
+        landmarks = header.split("\n") if k else []
+
+        start += header_size
+        distances = [view[start + i * count:start + (i + 1) * count]
+                     for i in range(k)]
+        return cls(landmarks, distances, positions)
+
+
+def distances_from(source, count, neighbors):
+    """
+    Returns a bytearray of BFS distances from position source to every
+    position, UNREACHABLE where there is no path.
+    """
+    distances = bytearray([UNREACHABLE]) * count
+    distances[source] = 0
+    layer = [source]
+    depth = 0
+    while layer:
+        depth = min(depth + 1, UNREACHABLE - 1)
+        next_layer = []
+        for i in layer:
+            for j in neighbors(i):
+                if distances[j] == UNREACHABLE:
+                    distances[j] = depth
+                    next_layer.append(j)
+        layer = next_layer
+    return distances
+
+
+def main():
+    import degrees
+    import snapshot
+
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python landmarks.py [directory] [k]")
+    directory = sys.argv[1] if len(sys.argv) >= 2 else "large"
+    k = int(sys.argv[2]) if len(sys.argv) == 3 else 16
+
+    print("Loading data...")
+    degrees.load_data(directory)
+    print("Data loaded.")
+    index = degrees.build_landmarks(k)
+    path = snapshot.snapshot_path(directory, FILENAME)
+    index.save(path)
+    print(f"{len(index.landmarks)} landmarks written to {path}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+
+class NameIndex():
+    """
+    Search index over people's names supporting exact, prefix and
+    edit-distance lookups. Names are compared in lowercase.
+
+    Prefix lookups binary-search a sorted name list; fuzzy lookups
+    gather candidates from a trigram inverted index and rank them
+    by edit distance.
+    """
+
+    def __init__(self, entries):
+        """
+        Builds the index from an iterable of (person_id, name) pairs.
+        """
+        people = {}
+        for person_id, name in entries:
+            people.setdefault(name.lower(), []).append(person_id)
+
+        # Distinct lowercase names, sorted, with their person_ids alongside
+        self.names = sorted(people)
+        self.people = [people[name] for name in self.names]
+
+        # Maps each trigram to the positions of the names containing it
+        self.grams = {}
+        for i, name in enumerate(self.names):
+            for gram in set(trigrams(name)):
+                postings = self.grams.get(gram)
+                if postings is None:
+                    postings = self.grams[gram] = array("l")
+                postings.append(i)
+
+    def __len__(self):
+        return len(self.names)
+
+    def exact(self, name):
+        """Returns the person_ids whose name is exactly name."""
+        name = name.lower()
+        i = bisect_left(self.names, name)
+        if i < len(self.names) and self.names[i] == name:
+            return list(self.people[i])
+        return []
+
+    def prefix(self, prefix, limit=10):
+        """
+        Returns up to limit (name, person_ids) pairs whose name
+        starts with prefix, shortest names first.
+        """
+        prefix = prefix.lower()
+        matches = []
+        i = bisect_left(self.names, prefix)
+        while i < len(self.names) and self.names[i].startswith(prefix):
+            matches.append(i)
+            i += 1
+        matches.sort(key=lambda i: (len(self.names[i]), self.names[i]))
+        return [(self.names[i], self.people[i]) for i in matches[:limit]]
+
+    def fuzzy(self, name, limit=10, max_distance=2):
+        """
+        Returns up to limit (name, person_ids, distance) triples whose
+        name is within max_distance edits of name, closest first.
+        """
+        name = name.lower()
+        grams = set(trigrams(name))
+
+        # One edit changes at most 3 trigrams, so closer names must
+        # share at least this many with the query
+        needed = len(grams) - 3 * max_distance
+        counts = Counter()
+        for gram in grams:
+            counts.update(self.grams.get(gram, ()))
+
+        matches = []
+        for i, shared in counts.items():
+            candidate = self.names[i]
+            if shared < needed or abs(len(candidate) - len(name)) > max_distance:
+                continue
+            distance = edit_distance(name, candidate, max_distance)
+            if distance <= max_distance:
+                matches.append((distance, candidate, i))
+
+        # Very short queries share no trigrams; fall back to a scan
+        if needed <= 0 and not matches:
+            for i, candidate in enumerate(self.names):
+                if abs(len(candidate) - len(name)) <= max_distance:
+                    distance = edit_distance(name, candidate, max_distance)
+                    if distance <= max_distance:
+                        matches.append((distance, candidate, i))
+
+        matches.sort()
+        return [(candidate, self.people[i], distance)
+                for distance, candidate, i in matches[:limit]]
+
+    def search(self, query, limit=10, max_distance=2):
+        """
+        Returns up to limit ranked (name, person_ids) candidates for
+        query: the exact match, then prefix matches, then fuzzy matches.
+        """
+        results = []
+        seen = set()
+
+        def add(name, person_ids):
+            if name not in seen and len(results) < limit:
+                seen.add(name)
+                results.append((name, person_ids))
+
+        exact = self.exact(query)
+        if exact:
+            add(query.lower(), exact)
+        for name, person_ids in self.prefix(query, limit):
+            add(name, person_ids)
+        for name, person_ids, _ in self.fuzzy(query, limit, max_distance):
+            add(name, person_ids)
+        return results
+
+
+def trigrams(name):
+    """Returns the trigrams of name, padded so short names have some."""
+    padded = f"  {name} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def edit_distance(a, b, limit):
+    """
+    Returns the Levenshtein distance between a and b, or limit + 1
+    once it is known to exceed limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        current = [i]
+        for j, cb in enumerate(b, start=1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb)
+            ))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return min(previous[-1], limit + 1)
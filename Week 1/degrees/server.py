@@ -0,0 +1,142 @@
+"""
+Long-running degrees query service.
+
+Loads the data once, then answers one JSON query per line, e.g.
+    {"id": 1, "source": "Kevin Bacon", "target": "Tom Hanks"}
+with one JSON response per line. Sources and targets may be names or
+IMDB ids. Queries are read from stdin, or from clients of a Unix socket
+if --socket is given.
+
+A line of the form {"delta": "directory"} adds the rows of the CSVs in
+that directory to the loaded data (see degrees.apply_delta).
+
+Usage: python server.py [directory] [--socket PATH]
+"""
+
+import json
+import os
+import socketserver
+import sys
+import threading
+
+import degrees
+from cache import PathCache
+
+# Shared by every connection; PathCache is not thread-safe on its own,
+# and deltas change the people and names that queries read
+cache = PathCache()
+lock = threading.Lock()
+
+
+def answer(line):
+    """
+    Returns the JSON response line for one JSON query line.
+    """
+    with lock:
+        return _answer(line)
+
+
+def _answer(line):
+    try:
+        query = json.loads(line)
+        response = {"id": query.get("id")}
+        if "delta" in query:
+            response["added"] = degrees.apply_delta(query["delta"])
+            return json.dumps(response)
+        source = resolve(query["source"])
+        target = resolve(query["target"])
+    except (ValueError, KeyError, AttributeError, TypeError) as e:
+        return json.dumps({"error": f"bad query: {e}"})
+    except LookupError as e:
+        response["error"] = str(e)
+        return json.dumps(response)
+
+    path = cache.shortest_path(source, target)
+
+    if path is None:
+        response["degrees"] = None
+        response["path"] = None
+    else:
+        response["degrees"] = len(path)
+        response["path"] = [
+            {
+                "movie_id": movie_id,
+                "movie": degrees.movies[movie_id]["title"],
+                "person_id": person_id,
+                "person": degrees.people[person_id]["name"],
+            }
+            for movie_id, person_id in path
+        ]
+    return json.dumps(response)
+
+
+def resolve(name):
+    """
+    Returns the one person id matching name, or raises LookupError.
+    """
+    person_ids = degrees.person_ids_for_name(name)
+    if len(person_ids) == 0:
+        suggestions = [ids for _, ids in degrees.search_names(name, limit=5)]
+        if suggestions:
+            raise LookupError(
+                f"person not found: {name} (did you mean "
+                + ", ".join(degrees.people[ids[0]]["name"] for ids in suggestions)
+                + "?)"
+            )
+        raise LookupError(f"person not found: {name}")
+    elif len(person_ids) > 1:
+        raise LookupError(f"ambiguous name: {name} ({', '.join(person_ids)})")
+    return person_ids[0]
+
+
+def serve(lines, out):
+    """Answers every query line from lines, writing responses to out."""
+    for line in lines:
+        if line.strip():
+            out.write(answer(line) + "\n")
+            out.flush()
+
+
+class QueryHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        for line in self.rfile:
+            line = line.decode("utf-8")
+            if line.strip():
+                self.wfile.write((answer(line) + "\n").encode("utf-8"))
+
+
+def main():
+    args = sys.argv[1:]
+    socket_path = None
+    if "--socket" in args:
+        i = args.index("--socket")
+        if i + 1 >= len(args):
+            sys.exit("Usage: python server.py [directory] [--socket PATH]")
+        socket_path = args[i + 1]
+        del args[i:i + 2]
+    if len(args) > 1:
+        sys.exit("Usage: python server.py [directory] [--socket PATH]")
+    directory = args[0] if args else "large"
+
+    print("Loading data...", file=sys.stderr)
+    degrees.load_data(directory)
+    print("Data loaded.", file=sys.stderr)
+
+    if socket_path is None:
+        serve(sys.stdin, sys.stdout)
+        return
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    with socketserver.ThreadingUnixStreamServer(socket_path, QueryHandler) as server:
+        print(f"Listening on {socket_path}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    os.remove(socket_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+Binary snapshot of a degrees dataset for near-instant startup.
+
+A snapshot holds the id and attribute tables, the CSR adjacency arrays
+and sorted lookup orders of a CompactGraph. It is memory-mapped on load,
+so nothing is parsed up front and concurrent processes share its pages.
+
+Usage: python snapshot.py [directory]
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping, Sequence
+
+from graph import CompactGraph
+
+FILENAME = "degrees.snapshot"
+MAGIC = b"DEGSNAP1"
+CSV_FILES = ("people.csv", "movies.csv", "stars.csv")
+
+# Tables stored as UTF-8 strings, in file order
+STRING_TABLES = ("person_ids", "person_names", "person_births",
+                 "movie_ids", "movie_titles", "movie_years")
+
+# Tables stored as int64 arrays, in file order
+INT_TABLES = ("person_offsets", "person_movies", "movie_offsets",
+              "movie_stars", "person_order", "movie_order", "name_order")
+
+# Every string table takes two sections: offsets then UTF-8 bytes
+SECTION_COUNT = 2 * len(STRING_TABLES) + len(INT_TABLES)
+
+
+def snapshot_path(directory, filename=FILENAME):
+    """Returns the path of a derived data file (the snapshot by default)."""
+    return os.path.join(directory, filename)
+
+
+def is_fresh(directory, filename=FILENAME):
+    """
+    Returns True if directory has a derived data file (the snapshot by
+    default) newer than all of its CSVs.
+    """
+    path = snapshot_path(directory, filename)
+    if not os.path.exists(path):
+        return False
+    built = os.path.getmtime(path)
+    for name in CSV_FILES:
+        csv_path = os.path.join(directory, name)
+        if os.path.exists(csv_path) and os.path.getmtime(csv_path) > built:
+            return False
+    return True
+
+
+def write_snapshot(graph, path):
+    """
+    Writes graph to path as a binary snapshot.
+    """
+    graph = graph.compacted()
+    sections = []
+    for name in STRING_TABLES:
+        offsets, blob = _encode_strings(getattr(graph, name))
+        sections.append(offsets.tobytes())
+        sections.append(blob)
+
+    person_order = sorted(range(len(graph.person_ids)),
+                          key=graph.person_ids.__getitem__)
+    movie_order = sorted(range(len(graph.movie_ids)),
+                         key=graph.movie_ids.__getitem__)
+    name_order = sorted(range(len(graph.person_names)),
+                        key=lambda p: graph.person_names[p].lower())
+    tables = {
+        "person_order": person_order,
+        "movie_order": movie_order,
+        "name_order": name_order,
+    }
+    for name in INT_TABLES:
+        values = tables[name] if name in tables else getattr(graph, name)
+        sections.append(array("q", values).tobytes())
+
+    # Header: magic, byte order, then (offset, length) of every section
+    header_size = len(MAGIC) + 8 + 16 * SECTION_COUNT
+    layout = []
+    position = header_size
+    for data in sections:
+        position = _align(position)
+        layout.append((position, len(data)))
+        position += len(data)
+
+    # Write to a temporary file first so readers never see a partial file
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", 1 if sys.byteorder == "little" else 0))
+        for offset, length in layout:
+            f.write(struct.pack("<QQ", offset, length))
+        for (offset, _), data in zip(layout, sections):
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(data)
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path):
+    """
+    Memory-maps the snapshot at path and returns a CompactGraph over it.
+    """
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(buffer)
+
+    if bytes(view[:len(MAGIC)]) != MAGIC:
+        raise ValueError(f"{path} is not a degrees snapshot")
+    (little,) = struct.unpack_from("<Q", view, len(MAGIC))
+    if bool(little) != (sys.byteorder == "little"):
+        raise ValueError(f"{path} was written on a different byte order")
+
+    sections = []
+    for i in range(SECTION_COUNT):
+        offset, length = struct.unpack_from("<QQ", view, len(MAGIC) + 8 + 16 * i)
+        sections.append(view[offset:offset + length])
+
+    tables = {}
+    for i, name in enumerate(STRING_TABLES):
+        tables[name] = StringTable(sections[2 * i].cast("q"), sections[2 * i + 1])
+    for i, name in enumerate(INT_TABLES):
+        tables[name] = sections[2 * len(STRING_TABLES) + i].cast("q")
+
+    return CompactGraph(
+        tables["person_ids"], tables["person_names"], tables["person_births"],
+        tables["movie_ids"], tables["movie_titles"], tables["movie_years"],
+        tables["person_offsets"], tables["person_movies"],
+        tables["movie_offsets"], tables["movie_stars"],
+        person_index=SortedIndex(tables["person_order"], tables["person_ids"]),
+        movie_index=SortedIndex(tables["movie_order"], tables["movie_ids"]),
+        name_index=SortedIndex(tables["name_order"], tables["person_names"],
+                               normalize=str.lower, unique=False)
+    )
+
+
+class StringTable(Sequence):
+    """
+    Sequence of strings decoded on access from an offsets array
+    and a UTF-8 byte buffer.
+    """
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+
+class SortedIndex(Mapping):
+    """
+    Maps strings to their index in table by binary search over order,
+    a permutation of the table sorted by normalize(string).
+
+    If unique is False, each key maps to the list of all matching indices.
+    """
+
+    def __init__(self, order, table, normalize=None, unique=True):
+        self.order = order
+        self.table = table
+        self.normalize = normalize
+        self.unique = unique
+        self.length = None
+
+    def _key(self, i):
+        if self.normalize is None:
+            return self.table[i]
+        return self.normalize(self.table[i])
+
+    def __getitem__(self, key):
+        lo = bisect_left(self.order, key, key=self._key)
+        hi = bisect_right(self.order, key, lo=lo, key=self._key)
+        if lo == hi:
+            raise KeyError(key)
+        if self.unique:
+            return self.order[lo]
+        return list(self.order[lo:hi])
+
+    def __contains__(self, key):
+        lo = bisect_left(self.order, key, key=self._key)
+        return lo < len(self.order) and self._key(self.order[lo]) == key
+
+    def __iter__(self):
+        previous = None
+        for i in self.order:
+            key = self._key(i)
+            if key != previous:
+                yield key
+                previous = key
+
+    def __len__(self):
+        if self.unique:
+            return len(self.order)
+        if self.length is None:
+            self.length = sum(1 for _ in self)
+        return self.length
+
+
+def _encode_strings(strings):
+    """Returns (offsets, blob) for a sequence of strings."""
+    offsets = array("q", [0])
+    chunks = []
+    position = 0
+    for s in strings:
+        data = s.encode("utf-8")
+        chunks.append(data)
+        position += len(data)
+        offsets.append(position)
+    return offsets, b"".join(chunks)
+
+
+def _align(position):
+    """Rounds position up to a multiple of 8 bytes."""
+    return (position + 7) & ~7
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python snapshot.py [directory]")
+    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+
+    print("Loading data...")
+    graph = CompactGraph.from_csv(directory)
+    path = snapshot_path(directory)
+    write_snapshot(graph, path)
+    print(f"Snapshot written to {path}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,11 @@
+import functools
+import heapq
+import inspect
+import itertools
+import time
+from collections import deque
+
+
 class Node():
     def __init__(self, person, parent, movie):
         self.person = person
@@ -5,15 +13,105 @@ class Node():
         self.movie = movie
 
 
+class SearchStats():
+    """
+    Counters filled in by a search when passed as its stats argument.
+    """
+
+    def __init__(self):
+        # People taken off the frontier and expanded; breadth-first
+        # searches stop as soon as the target is reached, not expanded
+        self.nodes_expanded = 0
+
+        # Most people waiting in the frontier at once, measured after
+        # each expansion
+        self.peak_frontier = 0
+
+        # (movie, person) neighbor pairs examined
+        self.neighbor_expansions = 0
+
+        # Seconds spent in the search
+        self.wall_time = 0.0
+
+    def __repr__(self):
+        return (f"SearchStats(nodes_expanded={self.nodes_expanded}, "
+                f"peak_frontier={self.peak_frontier}, "
+                f"neighbor_expansions={self.neighbor_expansions}, "
+                f"wall_time={self.wall_time:.6f})")
+
+
+def timed(search):
+    """
+    Decorates a search that takes a stats argument so that it also
+    records its wall time there. stats may be passed by position or
+    by keyword.
+    """
+    signature = inspect.signature(search)
+
+    @functools.wraps(search)
+    def wrapper(*args, **kwargs):
+        stats = signature.bind(*args, **kwargs).arguments.get("stats")
+        start = time.perf_counter()
+        try:
+            return search(*args, **kwargs)
+        finally:
+            if stats is not None:
+                stats.wall_time = time.perf_counter() - start
+    return wrapper
+
+
+class SearchTree():
+    """
+    Shortest-path tree rooted at source. parents maps every reached
+    person to the (movie, person) one step closer to source, or None
+    for source itself.
+    """
+
+    def __init__(self, source, parents):
+        self.source = source
+        self.parents = parents
+
+    def __contains__(self, person):
+        return person in self.parents
+
+    def __len__(self):
+        return len(self.parents)
+
+    def path_to(self, target):
+        """
+        Returns the list of (movie, person) pairs from source to target,
+        or None if target was not reached.
+        """
+        if target not in self.parents:
+            return None
+        path = []
+        person = target
+        while self.parents[person] is not None:
+            movie, parent = self.parents[person]
+            path.append((movie, person))
+            person = parent
+        path.reverse()
+        return path
+
+
 class StackFrontier():
+    """
+    Last-in first-out frontier backed by a deque, with a person index
+    kept in sync so contains_person is a hash lookup.
+    """
+
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+
+        # Maps person ids to how many of their nodes are in the frontier
+        self.people = {}
 
     def add(self, node):
         self.frontier.append(node)
+        self._index(node)
 
     def contains_person(self, person):
-        return any(node.person == person for node in self.frontier)
+        return person in self.people
 
     def empty(self):
         return len(self.frontier) == 0
@@ -22,10 +120,23 @@ class StackFrontier():
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.frontier.pop()
+            self._unindex(node)
             return node
 
+    def __len__(self):
+        return len(self.frontier)
+
+    def _index(self, node):
+        self.people[node.person] = self.people.get(node.person, 0) + 1
+
+    def _unindex(self, node):
+        count = self.people[node.person] - 1
+        if count:
+            self.people[node.person] = count
+        else:
+            del self.people[node.person]
+
 
 class QueueFrontier(StackFrontier):
 
@@ -33,6 +144,35 @@ class QueueFrontier(StackFrontier):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
+            node = self.frontier.popleft()
+            self._unindex(node)
+            return node
+
+
+class PriorityFrontier(StackFrontier):
+    """
+    Frontier that removes the node with the lowest priority first,
+    for weighted or heuristic search. Ties are removed in insertion order.
+
+    The priority is passed to add, or computed by key(node) if omitted.
+    """
+
+    def __init__(self, key=None):
+        super().__init__()
+        self.frontier = []
+        self.key = key
+        self.counter = itertools.count()
+
+    def add(self, node, priority=None):
+        if priority is None:
+            priority = self.key(node) if self.key is not None else 0
+        heapq.heappush(self.frontier, (priority, next(self.counter), node))
+        self._index(node)
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            _, _, node = heapq.heappop(self.frontier)
+            self._unindex(node)
             return node
@@ -0,0 +1,220 @@
+"""
+Bitboard representation of tic-tac-toe style boards.
+
+A position is two ints, x and o, with bit i * cols + j set when
+that player holds cell (i, j). Moves are a bit-or, and wins are
+found by comparing against precomputed line masks.
+"""
+
+from functools import lru_cache
+
+X = "X"
+O = "O"
+EMPTY = None
+
+
+class Layout():
+    """
+    Precomputed masks for a rows x cols board won by k in a row.
+    """
+
+    def __init__(self, rows, cols, k):
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.size = rows * cols
+        self.full = (1 << self.size) - 1
+
+        # Every run of k cells in a row, column or diagonal
+        self.lines = []
+        for i in range(rows):
+            for j in range(cols):
+                for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    cells = [(i + n * di, j + n * dj) for n in range(k)]
+                    if all(0 <= a < rows and 0 <= b < cols for a, b in cells):
+                        self.lines.append(sum(self.bit(a, b) for a, b in cells))
+
+        # Lines through each cell, to check only around the last move
+        self.lines_through = [[] for _ in range(self.size)]
+        for line in self.lines:
+            bits = line
+            while bits:
+                bit = bits & -bits
+                self.lines_through[bit.bit_length() - 1].append(line)
+                bits ^= bit
+
+        # Cells on the most lines first, a good default search order
+        self.move_order = sorted(
+            (1 << cell for cell in range(self.size)),
+            key=lambda bit: -len(self.lines_through[bit.bit_length() - 1])
+        )
+
+        # Cells touching each cell, including diagonally
+        self.neighbourhood = []
+        for i in range(rows):
+            for j in range(cols):
+                mask = 0
+                for a in range(max(0, i - 1), min(rows, i + 2)):
+                    for b in range(max(0, j - 1), min(cols, j + 2)):
+                        mask |= self.bit(a, b)
+                self.neighbourhood.append(mask & ~self.bit(i, j))
+
+        # Small boards get a win lookup table over every bit pattern
+        self.win_table = None
+        if self.size <= 16:
+            self.win_table = bytearray(1 << self.size)
+            for line in self.lines:
+                rest = self.full & ~line
+                sub = rest
+                while True:
+                    self.win_table[sub | line] = 1
+                    if sub == 0:
+                        break
+                    sub = (sub - 1) & rest
+
+        # Cell permutations for each rotation and reflection of the board
+        self.symmetries = []
+        maps = [lambda i, j: (i, j), lambda i, j: (rows - 1 - i, cols - 1 - j),
+                lambda i, j: (i, cols - 1 - j), lambda i, j: (rows - 1 - i, j)]
+        if rows == cols:
+            n = rows - 1
+            maps += [lambda i, j: (j, n - i), lambda i, j: (n - j, i),
+                     lambda i, j: (j, i), lambda i, j: (n - j, n - i)]
+        for mapping in maps:
+            self.symmetries.append(
+                [self.bit(*mapping(i, j)).bit_length() - 1
+                 for i in range(rows) for j in range(cols)]
+            )
+
+        # Small boards get a lookup table per symmetry
+        self.symmetry_tables = None
+        if self.size <= 9:
+            self.symmetry_tables = [
+                [self._permute(bits, perm) for bits in range(1 << self.size)]
+                for perm in self.symmetries
+            ]
+
+    def bit(self, i, j):
+        """Returns the bit for cell (i, j)."""
+        return 1 << (i * self.cols + j)
+
+    def cell(self, bit):
+        """Returns the (i, j) cell of a single bit."""
+        return divmod(bit.bit_length() - 1, self.cols)
+
+    def is_win(self, bits):
+        """Returns True if bits hold a complete line."""
+        if self.win_table is not None:
+            return self.win_table[bits] == 1
+        return any(bits & line == line for line in self.lines)
+
+    def is_win_at(self, bits, bit):
+        """Returns True if bits hold a complete line through bit."""
+        for line in self.lines_through[bit.bit_length() - 1]:
+            if bits & line == line:
+                return True
+        return False
+
+    def winner(self, x, o):
+        """Returns X, O or None."""
+        if self.is_win(x):
+            return X
+        if self.is_win(o):
+            return O
+        return None
+
+    def terminal(self, x, o):
+        """Returns True if someone has won or the board is full."""
+        return (x | o) == self.full or self.is_win(x) or self.is_win(o)
+
+    def near(self, bits):
+        """Returns the mask of cells touching any cell in bits."""
+        mask = 0
+        while bits:
+            bit = bits & -bits
+            mask |= self.neighbourhood[bit.bit_length() - 1]
+            bits ^= bit
+        return mask
+
+    def moves(self, x, o):
+        """Yields the bit of every empty cell."""
+        empty = self.full & ~(x | o)
+        while empty:
+            bit = empty & -empty
+            yield bit
+            empty ^= bit
+
+    def transform(self, bits, symmetry):
+        """Returns bits moved through the given symmetry."""
+        if self.symmetry_tables is not None:
+            return self.symmetry_tables[symmetry][bits]
+        return self._permute(bits, self.symmetries[symmetry])
+
+    def canonical(self, x, o):
+        """
+        Returns (key, symmetry): the smallest encoding of the position
+        over every symmetry, and the index of the symmetry producing it.
+        """
+        best = None
+        for s in range(len(self.symmetries)):
+            key = self.transform(x, s) | self.transform(o, s) << self.size
+            if best is None or key < best[0]:
+                best = (key, s)
+        return best
+
+    def untransform_bit(self, bit, symmetry):
+        """Maps a single bit back through the inverse of a symmetry."""
+        target = bit.bit_length() - 1
+        return 1 << self.symmetries[symmetry].index(target)
+
+    @staticmethod
+    def _permute(bits, perm):
+        result = 0
+        while bits:
+            low = bits & -bits
+            result |= 1 << perm[low.bit_length() - 1]
+            bits ^= low
+        return result
+
+
+@lru_cache(maxsize=None)
+def layout(rows=3, cols=3, k=3):
+    """Returns the shared Layout for a board shape."""
+    return Layout(rows, cols, k)
+
+
+def player(x, o):
+    """Returns the player to move: X moves first."""
+    return X if x.bit_count() == o.bit_count() else O
+
+
+def play(x, o, bit):
+    """Returns the position after the player to move takes bit."""
+    if x.bit_count() == o.bit_count():
+        return x | bit, o
+    return x, o | bit
+
+
+def from_board(board):
+    """Converts a list-of-lists board to (x, o)."""
+    rows, cols = len(board), len(board[0])
+    x = o = 0
+    for i in range(rows):
+        for j in range(cols):
+            if board[i][j] == X:
+                x |= 1 << (i * cols + j)
+            elif board[i][j] == O:
+                o |= 1 << (i * cols + j)
+    return x, o
+
+
+def to_board(x, o, rows=3, cols=3):
+    """Converts (x, o) back to a list-of-lists board."""
+    board = []
+    for i in range(rows):
+        row = []
+        for j in range(cols):
+            bit = 1 << (i * cols + j)
+            row.append(X if x & bit else O if o & bit else EMPTY)
+        board.append(row)
+    return board
@@ -0,0 +1,175 @@
+"""
+Monte Carlo Tree Search player for tic-tac-toe and m,n,k variants.
+
+Takes the same list-of-lists boards as tictactoe.py and returns an
+(i, j) action like tictactoe.minimax, so either engine can drive
+runner.py. Search runs on bitboards with UCT selection and uniformly
+random playouts.
+"""
+
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import bitboard
+import tictactoe as ttt
+
+# Exploration constant of the UCT formula
+EXPLORATION = math.sqrt(2)
+
+# Playouts per move when neither iterations nor time_limit is given
+DEFAULT_ITERATIONS = 2000
+
+# Result of a game that filled the board without a winner
+DRAW = "draw"
+
+
+class Node():
+    """
+    A position in the search tree, reached by move from parent.
+    wins counts playouts won by the player who made move, with draws
+    counting half. result is X, O or DRAW once the game is over here,
+    else None.
+    """
+
+    def __init__(self, layout, x, o, move=None, parent=None):
+        self.x = x
+        self.o = o
+        self.move = move
+        self.parent = parent
+        self.children = []
+        self.visits = 0
+        self.wins = 0.0
+
+        # The player who made move is the one not to play now
+        self.mover = ttt.O if bitboard.player(x, o) == ttt.X else ttt.X
+
+        if move is not None and layout.is_win_at(x if self.mover == ttt.X else o, move):
+            self.untried = []
+            self.result = self.mover
+        elif (x | o) == layout.full:
+            self.untried = []
+            self.result = DRAW
+        else:
+            self.untried = list(layout.moves(x, o))
+            self.result = None
+
+    def select(self):
+        """Returns the child with the highest UCT score."""
+        log_visits = math.log(self.visits)
+        return max(self.children, key=lambda child: (
+            child.wins / child.visits
+            + EXPLORATION * math.sqrt(log_visits / child.visits)
+        ))
+
+
+def mcts(board, iterations=None, time_limit=None, k=ttt.K, workers=1,
+         seed=None, stats=None):
+    """
+    Returns the action chosen by Monte Carlo Tree Search on the board.
+
+    Runs iterations playouts, or as many as fit in time_limit seconds,
+    or DEFAULT_ITERATIONS if neither is given, but always at least one.
+    With workers > 1, that many independent trees are searched in
+    separate processes and their root visit counts are summed (root
+    parallelism).
+
+    If stats is a tictactoe.SearchStats, its nodes count the playouts.
+    """
+    layout = ttt.layout_for(board, k)
+    x, o = bitboard.from_board(board)
+    if layout.terminal(x, o):
+        return None
+    if iterations is None and time_limit is None:
+        iterations = DEFAULT_ITERATIONS
+
+    if workers > 1:
+        seeds = [None if seed is None else seed + n for n in range(workers)]
+        if iterations is not None:
+            iterations = math.ceil(iterations / workers)
+        jobs = [(layout.rows, layout.cols, k, x, o, iterations, time_limit, s)
+                for s in seeds]
+        with ProcessPoolExecutor(workers) as executor:
+            results = list(executor.map(_search_root, jobs))
+    else:
+        results = [_search_root(
+            (layout.rows, layout.cols, k, x, o, iterations, time_limit, seed)
+        )]
+
+    visits = {}
+    for counts, playouts in results:
+        for move, count in counts.items():
+            visits[move] = visits.get(move, 0) + count
+        if stats is not None:
+            stats.nodes += playouts
+    return layout.cell(max(visits, key=visits.get))
+
+
+def _search_root(job):
+    """
+    Grows one search tree from the root position in job.
+    Returns ({move bit: root child visits}, playouts run).
+    """
+    rows, cols, k, x, o, iterations, time_limit, seed = job
+    layout = bitboard.layout(rows, cols, k)
+    rng = random.Random(seed)
+    root = Node(layout, x, o)
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+
+    # At least one playout always runs, so the root has a child to pick
+    playouts = 0
+    while True:
+        if playouts and iterations is not None and playouts >= iterations:
+            break
+        if playouts and deadline is not None and time.perf_counter() >= deadline:
+            break
+
+        # Selection: walk down fully expanded nodes by UCT
+        node = root
+        while not node.untried and node.children:
+            node = node.select()
+
+        # Expansion: add one untried move
+        if node.untried:
+            move = node.untried.pop(rng.randrange(len(node.untried)))
+            nx, no = bitboard.play(node.x, node.o, move)
+            child = Node(layout, nx, no, move, node)
+            node.children.append(child)
+            node = child
+
+        # Simulation: play random moves to the end
+        if node.result is not None:
+            winner = node.result
+        else:
+            winner = _playout(layout, node.x, node.o, rng)
+
+        # Backpropagation: credit every node whose mover won
+        while node is not None:
+            node.visits += 1
+            if winner == node.mover:
+                node.wins += 1
+            elif winner == DRAW:
+                node.wins += 0.5
+            node = node.parent
+        playouts += 1
+
+    return {child.move: child.visits for child in root.children}, playouts
+
+
+def _playout(layout, x, o, rng):
+    """Plays uniformly random moves from (x, o); returns X, O or DRAW."""
+    empty = list(layout.moves(x, o))
+    rng.shuffle(empty)
+    x_to_move = bitboard.player(x, o) == ttt.X
+    for move in empty:
+        if x_to_move:
+            x |= move
+            if layout.is_win_at(x, move):
+                return ttt.X
+        else:
+            o |= move
+            if layout.is_win_at(o, move):
+                return ttt.O
+        x_to_move = not x_to_move
+    return DRAW
@@ -1,9 +1,17 @@
 import pygame
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 
+import mcts
 import tictactoe as ttt
 
+# Engine playing the computer's moves: python runner.py [minimax|mcts]
+ENGINES = {"minimax": ttt.minimax, "mcts": mcts.mcts}
+if len(sys.argv) > 2 or (len(sys.argv) == 2 and sys.argv[1] not in ENGINES):
+    sys.exit("Usage: python runner.py [minimax|mcts]")
+engine = ENGINES[sys.argv[1] if len(sys.argv) == 2 else "minimax"]
+
 pygame.init()
 size = width, height = 600, 400
 
@@ -19,12 +27,22 @@ moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
 
 user = None
 board = ttt.initial_state()
-ai_turn = False
+
+# The AI searches on a worker thread so the window keeps redrawing
+executor = ThreadPoolExecutor(max_workers=1)
+ai_future = None
+ai_started = 0
+
+# Minimum time the AI appears to think, so its moves are visible
+AI_DELAY = 0.5
+
+clock = pygame.time.Clock()
 
 while True:
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            executor.shutdown(wait=False, cancel_futures=True)
             sys.exit()
 
     screen.fill(black)
@@ -102,21 +120,22 @@ while True:
         elif user == player:
             title = f"Play as {user}"
         else:
-            title = f"Computer thinking..."
+            dots = "." * (int(time.time() * 3) % 3 + 1)
+            title = f"Computer thinking{dots:<3}"
         title = largeFont.render(title, True, white)
         titleRect = title.get_rect()
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
+        # Check for AI move, starting a search or picking up its result
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
+            if ai_future is None:
+                ai_future = executor.submit(engine, board)
+                ai_started = time.time()
+            elif ai_future.done() and time.time() - ai_started >= AI_DELAY:
+                move = ai_future.result()
                 board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+                ai_future = None
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
@@ -141,6 +160,11 @@ while True:
                     time.sleep(0.2)
                     user = None
                     board = ttt.initial_state()
-                    ai_turn = False
+
+                    # Drop any search still running for the old game
+                    if ai_future is not None:
+                        ai_future.cancel()
+                        ai_future = None
 
     pygame.display.flip()
+    clock.tick(60)
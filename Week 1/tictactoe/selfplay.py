@@ -0,0 +1,191 @@
+"""
+Plays tic-tac-toe engines against each other without pygame.
+
+Two engines play a number of games, swapping X and O every game, and
+the run reports throughput, per-move latency and results for each.
+
+Engines:
+    minimax     exhaustive minimax, no transposition table
+    memo        minimax with the perfect-play / transposition table
+    alphabeta   alpha-beta with killer moves
+    mcts        Monte Carlo Tree Search
+    random      uniformly random legal moves
+
+minimax and memo fall back to iterative deepening on boards other than
+3x3, where alphabeta is not available.
+
+Usage: python selfplay.py engine engine [--games N] [--board RxCxK]
+                          [--time-limit S] [--workers N] [--seed N]
+"""
+
+import multiprocessing
+import random
+import statistics
+import sys
+import time
+
+import mcts
+import tictactoe as ttt
+
+USAGE = ("Usage: python selfplay.py engine engine [--games N] [--board RxCxK] "
+         "[--time-limit S] [--workers N] [--seed N]")
+
+
+def _minimax(board, k, time_limit, rng, stats):
+    return ttt.minimax(board, time_limit=time_limit, k=k, stats=stats, memo=False)
+
+
+def _memo(board, k, time_limit, rng, stats):
+    return ttt.minimax(board, time_limit=time_limit, k=k, stats=stats)
+
+
+def _alphabeta(board, k, time_limit, rng, stats):
+    if ttt.layout_for(board, k) is not ttt.LAYOUT:
+        raise ValueError("alphabeta only plays the 3x3 game")
+    return ttt.alphabeta(board, stats=stats)
+
+
+def _mcts(board, k, time_limit, rng, stats):
+    return mcts.mcts(board, time_limit=time_limit, k=k,
+                     seed=rng.randrange(1 << 32), stats=stats)
+
+
+def _random(board, k, time_limit, rng, stats):
+    return rng.choice(sorted(ttt.actions(board)))
+
+
+ENGINES = {
+    "minimax": _minimax,
+    "memo": _memo,
+    "alphabeta": _alphabeta,
+    "mcts": _mcts,
+    "random": _random,
+}
+
+
+class EngineStats():
+    """
+    Totals for one engine over a run.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.wins = 0
+        self.losses = 0
+        self.draws = 0
+        self.nodes = 0
+        self.seconds = 0.0
+        self.latencies = []
+
+    def add_move(self, seconds, nodes):
+        self.seconds += seconds
+        self.nodes += nodes
+        self.latencies.append(seconds)
+
+    def percentile(self, p):
+        """Returns the p-th percentile move latency in seconds."""
+        if not self.latencies:
+            return 0.0
+        if len(self.latencies) == 1:
+            return self.latencies[0]
+        return statistics.quantiles(self.latencies, n=100, method="inclusive")[p - 1]
+
+
+def play_game(job):
+    """
+    Plays one game and returns (winner, moves), where winner is X, O or
+    None and moves is a list of (player, seconds, nodes) per move.
+    """
+    x_name, o_name, rows, cols, k, time_limit, seed = job
+    rng = random.Random(seed)
+    engines = {ttt.X: ENGINES[x_name], ttt.O: ENGINES[o_name]}
+
+    board = ttt.initial_state(rows, cols)
+    moves = []
+    while not ttt.terminal(board, k):
+        player = ttt.player(board)
+        stats = ttt.SearchStats()
+        start = time.perf_counter()
+        action = engines[player](board, k, time_limit, rng, stats)
+        seconds = time.perf_counter() - start
+        board = ttt.result(board, action)
+        moves.append((player, seconds, stats.nodes))
+    return ttt.winner(board, k), moves
+
+
+def run(first, second, games=100, rows=3, cols=3, k=ttt.K, time_limit=None,
+        workers=1, seed=0):
+    """
+    Plays games between engines first and second, first taking X in
+    even-numbered games. Returns (EngineStats for first, EngineStats
+    for second, wall-clock seconds).
+    """
+    if time_limit is None and (rows, cols, k) != (3, 3, 3):
+        time_limit = ttt.DEFAULT_TIME_LIMIT
+    jobs = []
+    for n in range(games):
+        x_name, o_name = (first, second) if n % 2 == 0 else (second, first)
+        jobs.append((x_name, o_name, rows, cols, k, time_limit, seed + n))
+
+    start = time.perf_counter()
+    if workers > 1:
+        with multiprocessing.Pool(workers) as pool:
+            outcomes = pool.map(play_game, jobs)
+    else:
+        outcomes = [play_game(job) for job in jobs]
+    elapsed = time.perf_counter() - start
+
+    # Named by seat, so an engine can play itself
+    a, b = EngineStats(first), EngineStats(second)
+    for n, (winner, moves) in enumerate(outcomes):
+        sides = {ttt.X: a, ttt.O: b} if n % 2 == 0 else {ttt.X: b, ttt.O: a}
+        for player, seconds, nodes in moves:
+            sides[player].add_move(seconds, nodes)
+        if winner is None:
+            a.draws += 1
+            b.draws += 1
+        else:
+            loser = ttt.O if winner == ttt.X else ttt.X
+            sides[winner].wins += 1
+            sides[loser].losses += 1
+    return a, b, elapsed
+
+
+def main():
+    args = sys.argv[1:]
+    if len(args) < 2 or args[0] not in ENGINES or args[1] not in ENGINES:
+        sys.exit(USAGE)
+    first, second = args[:2]
+    args = args[2:]
+    options = {"--games": "100", "--board": "3x3x3", "--time-limit": None,
+               "--workers": "1", "--seed": "0"}
+    while args:
+        if args[0] not in options or len(args) < 2:
+            sys.exit(USAGE)
+        options[args[0]] = args[1]
+        args = args[2:]
+    try:
+        rows, cols, k = (int(n) for n in options["--board"].split("x"))
+    except ValueError:
+        sys.exit(USAGE)
+    time_limit = options["--time-limit"]
+    time_limit = float(time_limit) if time_limit is not None else None
+    games = int(options["--games"])
+
+    a, b, elapsed = run(first, second, games, rows, cols, k, time_limit,
+                        int(options["--workers"]), int(options["--seed"]))
+
+    print(f"{games} games on {rows}x{cols}, {k} in a row: "
+          f"{elapsed:.2f} s, {games / elapsed:.1f} games/s")
+    print(f"  {'engine':<12} {'W':>5} {'D':>5} {'L':>5} {'moves':>7} "
+          f"{'nodes/s':>11} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8}")
+    for stats in (a, b):
+        rate = stats.nodes / stats.seconds if stats.seconds else 0.0
+        print(f"  {stats.name:<12} {stats.wins:5} {stats.draws:5} {stats.losses:5} "
+              f"{len(stats.latencies):7} {rate:11.0f} "
+              f"{stats.percentile(50) * 1000:8.3f} {stats.percentile(90) * 1000:8.3f} "
+              f"{stats.percentile(99) * 1000:8.3f}")
+
+
+if __name__ == "__main__":
+    main()
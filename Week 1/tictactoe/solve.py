@@ -0,0 +1,52 @@
+"""
+Solves 3x3 tic-tac-toe and writes the perfect-play table.
+
+Every position reachable from the empty board is searched once, and
+the value and best move of each non-terminal position is stored under
+its canonical (symmetry-folded) bitboard key. minimax loads the table
+lazily, after which every 3x3 move is a lookup.
+
+Usage: python solve.py [path]
+"""
+
+import struct
+import sys
+
+import tictactoe as ttt
+
+
+def solve():
+    """
+    Returns {canonical key: (value, best move bit)} for every
+    reachable non-terminal 3x3 position.
+
+    The memoized search has no pruning, so searching the empty board
+    into a fresh table visits every reachable position.
+    """
+    table = {}
+    ttt._max_value(0, 0, table)
+    return table
+
+
+def write_table(table, path=ttt.PERFECT_PLAY_PATH):
+    """Writes table to path in the format load_perfect_play reads."""
+    with open(path, "wb") as f:
+        f.write(ttt.PERFECT_PLAY_MAGIC)
+        for key in sorted(table):
+            value, move = table[key]
+            packed = (value + 1) << 4 | (move.bit_length() - 1)
+            f.write(struct.pack("<IB", key, packed))
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python solve.py [path]")
+    path = sys.argv[1] if len(sys.argv) == 2 else ttt.PERFECT_PLAY_PATH
+
+    table = solve()
+    write_table(table, path)
+    print(f"{len(table)} positions written to {path}.")
+
+
+if __name__ == "__main__":
+    main()
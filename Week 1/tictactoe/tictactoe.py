@@ -3,148 +3,448 @@ Tic Tac Toe Player
 """
 
 import math
-import copy
-import random
+import os
+import struct
+import time
+
+import bitboard
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Cells in a row needed to win, unless a function is given another k
+K = 3
+
+# Masks and symmetry tables for the 3x3 board
+LAYOUT = bitboard.layout(3, 3, K)
+
+# Seconds per move for boards too big to search exhaustively
+DEFAULT_TIME_LIMIT = 1.0
+
+# Score of a won position in the depth-limited search, before the
+# ply it was reached at is subtracted so faster wins score higher
+WIN = 1_000_000
+
+# Line scans allowed between clock checks in the time-bounded search,
+# so big boards, whose leaves each scan every line, poll more often
+POLL_LINES = 2048
+
+# Transposition table: canonical position -> (value, best move bit on it)
+transpositions = {}
 
-def initial_state():
+# Perfect-play table written by solve.py, merged into transpositions
+# the first time minimax needs it
+PERFECT_PLAY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                 "perfect_play.bin")
+PERFECT_PLAY_MAGIC = b"TTTPP001"
+perfect_play_loaded = False
+
+# Move bits in search order: cells on the most lines (centre, corners) first
+MOVE_ORDER = LAYOUT.move_order
+
+
+class SearchStats():
+    """
+    Counters filled in by a search when passed as its stats argument.
+    """
+
+    def __init__(self):
+        # Positions visited, including terminal ones
+        self.nodes = 0
+
+        # Move loops cut short by alpha-beta pruning
+        self.cutoffs = 0
+
+        # Positions answered from the transposition table
+        self.table_hits = 0
+
+        # Deepest iterative deepening pass completed
+        self.depth = 0
+
+    def __repr__(self):
+        return (f"SearchStats(nodes={self.nodes}, cutoffs={self.cutoffs}, "
+                f"table_hits={self.table_hits}, depth={self.depth})")
+
+
+def initial_state(rows=3, cols=3):
     """
     Returns starting state of the board.
     """
-    return [[EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY]]
+    return [[EMPTY] * cols for _ in range(rows)]
 
 
 def player(board):
     """
     Returns player who has the next turn on a board.
     """
-    # Check if X has already played and return the player
-    moves = 1
-    for row in board:
-        for move in row:
-            if not move == EMPTY:
-                moves += 1
-
-    # Return the correct player
-    if moves % 2 == 0:
-        return (O)
-    else:
-        return (X)
+    x, o = bitboard.from_board(board)
+    return bitboard.player(x, o)
 
 
 def actions(board):
     """
     Returns set of all possible actions (i, j) available on the board.
     """
-    list = set()
-    for i in range(len(board)):
-        for j in range(len(board)):
-            if board[i][j] == EMPTY:
-                list.add((i, j))
-    return (list)
+    return {(i, j) for i, row in enumerate(board)
+            for j, cell in enumerate(row) if cell == EMPTY}
 
 
 def result(board, action):
     """
     Returns the board that results from making move (i, j) on the board.
     """
-    try:
-        turn = player(board)
-        actionRow = action[0]
-        actionCol = action[1]
-        newBoard = copy.deepcopy(board)
-        newBoard[actionRow][actionCol] = turn
-        return (newBoard)
-    except Exception as e:
-        print("Error")
+    i, j = action
+    if board[i][j] != EMPTY:
+        raise ValueError(f"cell {action} is already taken")
+    new_board = [row[:] for row in board]
+    new_board[i][j] = player(board)
+    return new_board
 
 
-def winner(board):
+def winner(board, k=K):
     """
     Returns the winner of the game, if there is one.
     """
-    for i in range(len(board)):
-        if board[i][0] == board[i][1] == board[i][2]:
-            return board[i][0]
-        elif board[0][i] == board[1][i] == board[2][i]:
-            return board[0][i]
-    if board[0][0] == board[1][1] == board[2][2] or board[0][2] == board[1][1] == board[2][0]:
-        return board[1][1]
-
-    if len(actions(board)) == 0:
-        return ("None")
+    x, o = bitboard.from_board(board)
+    return layout_for(board, k).winner(x, o)
 
-    return False
 
-
-def terminal(board):
+def terminal(board, k=K):
     """
     Returns True if game is over, False otherwise.
     """
-    win = winner(board)
-    if not win:
-        return False
-    else:
-        return win
+    x, o = bitboard.from_board(board)
+    return layout_for(board, k).terminal(x, o)
 
 
-def utility(board):
+def utility(board, k=K):
     """
     Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
     """
-    if winner(board) == X:
+    x, o = bitboard.from_board(board)
+    layout = layout_for(board, k)
+    if layout.is_win(x):
         return 1
-    elif winner(board) == O:
+    elif layout.is_win(o):
         return -1
-    else:
-        return 0
+    return 0
+
 
+def layout_for(board, k=K):
+    """Returns the bitboard Layout for the board's shape and k."""
+    return bitboard.layout(len(board), len(board[0]), k)
 
-def minimax(board):
+
+def minimax(board, stats=None, memo=True, time_limit=None, k=K):
     """
     Returns the optimal action for the current player on the board.
+
+    The 3x3 game is answered from the perfect-play table written by
+    solve.py, or searched exhaustively if it is missing. With memo
+    True this is always the case on 3x3, and time_limit is ignored.
+
+    On any other m,n,k board, or on 3x3 with memo False and a
+    time_limit, an iterative deepening alpha-beta search with a
+    heuristic evaluation runs instead. It returns the best move of the
+    deepest pass finished within time_limit seconds.
+
+    If memo is False, the transposition table is neither read nor
+    written, giving the plain exhaustive search. If stats is a
+    SearchStats, it is filled in with node counts.
     """
-    if player(board) == X:
-        _, move = max_value(board)
-        return move
+    # The time limit also covers building the layout of a new board
+    start = time.perf_counter()
+    layout = layout_for(board, k)
+    x, o = bitboard.from_board(board)
+    if layout.terminal(x, o):
+        return None
+    if layout is LAYOUT and memo:
+        # With the perfect-play table loaded this is a single lookup
+        load_perfect_play()
+    elif layout is not LAYOUT or time_limit is not None:
+        if time_limit is None:
+            time_limit = DEFAULT_TIME_LIMIT
+        return layout.cell(_deepening(layout, x, o, start + time_limit, stats))
+
+    table = transpositions if memo else None
+    if bitboard.player(x, o) == X:
+        _, move = _max_value(x, o, table, stats)
     else:
-        _, move = min_value(board)
-        return move
+        _, move = _min_value(x, o, table, stats)
+    return LAYOUT.cell(move)
+
+
+def load_perfect_play(path=PERFECT_PLAY_PATH):
+    """
+    Merges the perfect-play table at path into the transposition table,
+    once. Returns False if there is no table to load.
+    """
+    global perfect_play_loaded
+    if perfect_play_loaded:
+        return True
+    if not os.path.exists(path):
+        return False
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:len(PERFECT_PLAY_MAGIC)] != PERFECT_PLAY_MAGIC:
+        raise ValueError(f"{path} is not a perfect-play table")
+    for key, packed in struct.iter_unpack("<IB", data[len(PERFECT_PLAY_MAGIC):]):
+        # Value is stored offset by 1, the move as a cell index
+        transpositions[key] = ((packed >> 4) - 1, 1 << (packed & 0xF))
+    perfect_play_loaded = True
+    return True
 
 
 def max_value(board):
-    if terminal(board):
-        return utility(board), None
+    """
+    Returns (value, action) for X to move on the board.
+    """
+    v, move = _max_value(*bitboard.from_board(board), transpositions)
+    return v, LAYOUT.cell(move) if move else None
+
+
+def min_value(board):
+    """
+    Returns (value, action) for O to move on the board.
+    """
+    v, move = _min_value(*bitboard.from_board(board), transpositions)
+    return v, LAYOUT.cell(move) if move else None
+
+
+def alphabeta(board, stats=None):
+    """
+    Returns the optimal action for the current player on the board,
+    found by alpha-beta search with centre/corner-first move ordering
+    and killer moves. If stats is a SearchStats, it is filled in.
+    """
+    x, o = bitboard.from_board(board)
+    if LAYOUT.terminal(x, o):
+        return None
+
+    # Move that last caused a cutoff at each ply, tried first there
+    killers = {}
+    _, move = _alphabeta(x, o, -math.inf, math.inf, 0, killers, stats)
+    return LAYOUT.cell(move)
+
+
+def _utility(x, o):
+    if LAYOUT.is_win(x):
+        return 1
+    elif LAYOUT.is_win(o):
+        return -1
+    return 0
+
+
+def _max_value(x, o, table, stats=None):
+    if stats is not None:
+        stats.nodes += 1
+    if LAYOUT.terminal(x, o):
+        return _utility(x, o), None
+
+    # Reuse the result of any symmetric position already searched
+    if table is not None:
+        key, symmetry = LAYOUT.canonical(x, o)
+        if key in table:
+            if stats is not None:
+                stats.table_hits += 1
+            v, move = table[key]
+            return v, LAYOUT.untransform_bit(move, symmetry)
 
     v = -math.inf
     best_move = None
 
-    for action in actions(board):
-        value, _ = min_value(result(board, action))
+    for move in LAYOUT.moves(x, o):
+        value, _ = _min_value(x | move, o, table, stats)
         if value > v:
             v = value
-            best_move = action
+            best_move = move
 
+    if table is not None:
+        table[key] = (v, LAYOUT.transform(best_move, symmetry))
     return v, best_move
 
 
-def min_value(board):
-    if terminal(board):
-        return utility(board), None
+def _min_value(x, o, table, stats=None):
+    if stats is not None:
+        stats.nodes += 1
+    if LAYOUT.terminal(x, o):
+        return _utility(x, o), None
+
+    if table is not None:
+        key, symmetry = LAYOUT.canonical(x, o)
+        if key in table:
+            if stats is not None:
+                stats.table_hits += 1
+            v, move = table[key]
+            return v, LAYOUT.untransform_bit(move, symmetry)
 
     v = math.inf
     best_move = None
 
-    for action in actions(board):
-        value, _ = max_value(result(board, action))
+    for move in LAYOUT.moves(x, o):
+        value, _ = _max_value(x, o | move, table, stats)
         if value < v:
             v = value
-            best_move = action
+            best_move = move
 
-    return v, best_move
\ No newline at end of file
+    if table is not None:
+        table[key] = (v, LAYOUT.transform(best_move, symmetry))
+    return v, best_move
+
+
+def _ordered_moves(x, o, killer):
+    """Yields empty cells: the killer move if legal, then MOVE_ORDER."""
+    empty = LAYOUT.full & ~(x | o)
+    if killer is not None and killer & empty:
+        yield killer
+    for bit in MOVE_ORDER:
+        if bit & empty and bit != killer:
+            yield bit
+
+
+def _alphabeta(x, o, alpha, beta, ply, killers, stats):
+    if stats is not None:
+        stats.nodes += 1
+    if LAYOUT.terminal(x, o):
+        return _utility(x, o), None
+
+    maximizing = bitboard.player(x, o) == X
+    v = -math.inf if maximizing else math.inf
+    best_move = None
+
+    for move in _ordered_moves(x, o, killers.get(ply)):
+        if maximizing:
+            value, _ = _alphabeta(x | move, o, alpha, beta, ply + 1, killers, stats)
+            if value > v:
+                v, best_move = value, move
+            alpha = max(alpha, v)
+        else:
+            value, _ = _alphabeta(x, o | move, alpha, beta, ply + 1, killers, stats)
+            if value < v:
+                v, best_move = value, move
+            beta = min(beta, v)
+
+        if alpha >= beta:
+            killers[ply] = move
+            if stats is not None:
+                stats.cutoffs += 1
+            break
+
+    return v, best_move
+
+
+class _Timeout(Exception):
+    pass
+
+
+class _Deadline():
+    """State shared by one iterative deepening search."""
+
+    def __init__(self, layout, deadline, stats):
+        self.layout = layout
+        self.deadline = deadline
+        self.stats = stats
+        self.nodes = 0
+        self.interval = max(1, POLL_LINES // len(layout.lines))
+        self.killers = {}
+        self.root_best = None
+
+    def tick(self):
+        self.nodes += 1
+        if self.stats is not None:
+            self.stats.nodes += 1
+        if self.nodes % self.interval == 0 and time.perf_counter() >= self.deadline:
+            raise _Timeout()
+
+    def ordered(self, me, opp, ply):
+        """
+        Yields candidate moves: the previous pass's best move at the root,
+        the killer move, then empty cells next to a stone in layout order.
+        """
+        layout = self.layout
+        empty = layout.full & ~(me | opp)
+        if me | opp:
+            candidates = empty & layout.near(me | opp)
+        else:
+            candidates = empty
+        first = [self.root_best if ply == 0 else None, self.killers.get(ply)]
+        tried = 0
+        for move in first:
+            if move is not None and move & candidates and not move & tried:
+                tried |= move
+                yield move
+        for move in layout.move_order:
+            if move & candidates and not move & tried:
+                yield move
+
+
+def _deepening(layout, x, o, deadline, stats):
+    """
+    Returns the best move bit for the player to move, searching one ply
+    deeper each pass until the time.perf_counter() deadline.
+    """
+    search = _Deadline(layout, deadline, stats)
+    me, opp = (x, o) if bitboard.player(x, o) == X else (o, x)
+    remaining = (layout.full & ~(x | o)).bit_count()
+
+    # Always have a legal answer, even if no pass finishes
+    best_move = next(search.ordered(me, opp, 0))
+    for depth in range(1, remaining + 1):
+        try:
+            value, move = _negamax(layout, me, opp, depth, -math.inf, math.inf, 0, search)
+        except _Timeout:
+            break
+        best_move = search.root_best = move
+        if stats is not None:
+            stats.depth = depth
+
+        # A forced win or loss will not change with more depth
+        if abs(value) >= WIN - layout.size:
+            break
+    return best_move
+
+
+def _negamax(layout, me, opp, depth, alpha, beta, ply, search):
+    """
+    Depth-limited alpha-beta search from the view of the player to move,
+    whose cells are me. Returns (score, best move bit).
+    """
+    search.tick()
+    if (me | opp) == layout.full:
+        return 0, None
+    if depth == 0:
+        return _evaluate(layout, me, opp), None
+
+    best, best_move = -math.inf, None
+    for move in search.ordered(me, opp, ply):
+        mine = me | move
+        if layout.is_win_at(mine, move):
+            value = WIN - ply
+        else:
+            value = -_negamax(layout, opp, mine, depth - 1, -beta, -alpha, ply + 1, search)[0]
+        if value > best:
+            best, best_move = value, move
+        alpha = max(alpha, value)
+        if alpha >= beta:
+            search.killers[ply] = move
+            if search.stats is not None:
+                search.stats.cutoffs += 1
+            break
+    return best, best_move
+
+
+def _evaluate(layout, me, opp):
+    """
+    Scores open lines: each line only one player has stones on is worth
+    4 ** stones to them, so longer threats dominate.
+    """
+    score = 0
+    for line in layout.lines:
+        mine = (me & line).bit_count()
+        theirs = (opp & line).bit_count()
+        if mine and not theirs:
+            score += 4 ** mine
+        elif theirs and not mine:
+            score -= 4 ** theirs
+    return score
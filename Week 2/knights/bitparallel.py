@@ -0,0 +1,135 @@
+"""
+Bit-parallel truth tables for logic.py sentences.
+
+Each sentence is evaluated over a whole block of models at once: a
+Python int holds one bit per model, so And, Or and Not over every
+model in the block are single bitwise operations. The 2^n models are
+split into blocks of 2^CHUNK_BITS, and only the tables of subformulas
+that appear more than once are kept while a block is evaluated, so
+memory grows with the shared subformulas rather than with the KB.
+"""
+
+from logic import Sentence, Symbol, Not, And, Or, Implication, Biconditional
+
+# Symbols varying inside one block; a block is 2 ** CHUNK_BITS models
+CHUNK_BITS = 20
+
+
+def patterns(bits):
+    """
+    Returns one int per symbol position below bits: bit m of pattern i
+    is bit i of m, for every m in a block of 2 ** bits models.
+    """
+    size = 1 << bits
+    result = []
+    for i in range(bits):
+        run = 1 << i
+        pattern = ((1 << run) - 1) << run
+        width = 2 * run
+        while width < size:
+            pattern |= pattern << width
+            width *= 2
+        result.append(pattern)
+    return result
+
+
+def truth_table(sentence, values, mask, cache=None):
+    """
+    Returns sentence's truth table as an int, where values maps each
+    symbol name to its table and mask has a bit set for every model.
+    cache, if given, has a key for the id of each subformula whose
+    table should be kept for reuse, mapped to None until it is computed.
+    """
+    if isinstance(sentence, Symbol):
+        return values[sentence.name]
+    if cache is not None and cache.get(id(sentence)) is not None:
+        return cache[id(sentence)]
+
+    if isinstance(sentence, Not):
+        table = mask ^ truth_table(sentence.operand, values, mask, cache)
+    elif isinstance(sentence, And):
+        table = mask
+        for conjunct in sentence.conjuncts:
+            table &= truth_table(conjunct, values, mask, cache)
+            if not table:
+                break
+    elif isinstance(sentence, Or):
+        table = 0
+        for disjunct in sentence.disjuncts:
+            table |= truth_table(disjunct, values, mask, cache)
+            if table == mask:
+                break
+    elif isinstance(sentence, Implication):
+        table = (mask ^ truth_table(sentence.antecedent, values, mask, cache)
+                 | truth_table(sentence.consequent, values, mask, cache))
+    elif isinstance(sentence, Biconditional):
+        table = mask ^ (truth_table(sentence.left, values, mask, cache)
+                        ^ truth_table(sentence.right, values, mask, cache))
+    else:
+        Sentence.validate(sentence)
+        raise TypeError(f"cannot evaluate {type(sentence).__name__}")
+
+    if cache is not None and id(sentence) in cache:
+        cache[id(sentence)] = table
+    return table
+
+
+def shared(*sentences):
+    """
+    Returns the ids of compound subformulas reached more than once
+    from sentences, the only ones worth caching.
+    """
+    seen = set()
+    result = set()
+    stack = list(sentences)
+    while stack:
+        sentence = stack.pop()
+        if isinstance(sentence, Symbol):
+            continue
+        if id(sentence) in seen:
+            result.add(id(sentence))
+            continue
+        seen.add(id(sentence))
+        stack.extend(sentence.arguments())
+    return result
+
+
+def blocks(symbols, chunk_bits=CHUNK_BITS):
+    """
+    Yields (values, mask) for each block of models over symbols, with
+    values mapping every symbol name to its truth table in the block.
+    """
+    symbols = list(symbols)
+    low = min(len(symbols), chunk_bits)
+    mask = (1 << (1 << low)) - 1
+    inner = dict(zip(symbols[:low], patterns(low)))
+    outer = symbols[low:]
+
+    # Symbols past the first chunk_bits are constant within a block
+    for block in range(1 << len(outer)):
+        values = dict(inner)
+        for i, name in enumerate(outer):
+            values[name] = mask if block >> i & 1 else 0
+        yield values, mask
+
+
+def model_check(knowledge, query, chunk_bits=CHUNK_BITS):
+    """Checks if knowledge base entails query."""
+    symbols = sorted(knowledge.frozen_symbols() | query.frozen_symbols())
+    reused = shared(knowledge, query)
+    for values, mask in blocks(symbols, chunk_bits):
+        cache = dict.fromkeys(reused)
+        knowledge_true = truth_table(knowledge, values, mask, cache)
+        if knowledge_true & ~truth_table(query, values, mask, cache):
+            return False
+    return True
+
+
+def count_models(sentence, chunk_bits=CHUNK_BITS):
+    """Returns the number of models over its symbols where sentence is true."""
+    count = 0
+    reused = shared(sentence)
+    for values, mask in blocks(sorted(sentence.frozen_symbols()), chunk_bits):
+        table = truth_table(sentence, values, mask, dict.fromkeys(reused))
+        count += table.bit_count()
+    return count
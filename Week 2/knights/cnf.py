@@ -0,0 +1,132 @@
+"""
+Conversion of logic.py sentences to conjunctive normal form.
+
+Clauses are lists of int literals in the DIMACS convention: variable v
+is the literal v and its negation -v. Compound subformulas get a fresh
+variable defined equivalent to them (the Tseitin transformation), so
+the clauses grow linearly with the sentence instead of exponentially.
+"""
+
+from logic import Sentence, Symbol, Not, And, Or, Implication, Biconditional
+
+
+class CNF():
+    """
+    Clauses for a set of sentences, with the variable numbering used.
+    """
+
+    def __init__(self):
+        self.clauses = []
+
+        # Symbol name -> variable, and variable -> symbol name
+        # (None for variables introduced to name a subformula)
+        self.variables = {}
+        self.names = [None]
+
+        # Subformula -> literal equivalent to it, so a subformula that
+        # appears more than once is only defined once
+        self.definitions = {}
+
+    def __len__(self):
+        return len(self.clauses)
+
+    @property
+    def num_variables(self):
+        return len(self.names) - 1
+
+    def variable(self, name):
+        """Returns the variable for the symbol name, creating it if new."""
+        if name not in self.variables:
+            self.variables[name] = len(self.names)
+            self.names.append(name)
+        return self.variables[name]
+
+    def fresh(self):
+        """Returns a new variable that stands for no symbol."""
+        self.names.append(None)
+        return len(self.names) - 1
+
+    def add(self, sentence):
+        """
+        Adds clauses that hold exactly when sentence is true.
+
+        The top of the sentence is split into clauses directly, and only
+        subformulas nested inside a clause are named by new variables.
+        """
+        Sentence.validate(sentence)
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.clauses.append([self.literal(d) for d in sentence.disjuncts])
+        elif isinstance(sentence, Implication):
+            self.clauses.append([-self.literal(sentence.antecedent),
+                                 self.literal(sentence.consequent)])
+        elif isinstance(sentence, Biconditional):
+            left = self.literal(sentence.left)
+            right = self.literal(sentence.right)
+            self.clauses.append([-left, right])
+            self.clauses.append([left, -right])
+        elif isinstance(sentence, Not) and isinstance(sentence.operand, Not):
+            self.add(sentence.operand.operand)
+        elif isinstance(sentence, Not) and isinstance(sentence.operand, Or):
+            for disjunct in sentence.operand.disjuncts:
+                self.add(Not(disjunct))
+        elif isinstance(sentence, Not) and isinstance(sentence.operand, And):
+            self.clauses.append([-self.literal(c) for c in sentence.operand.conjuncts])
+        else:
+            self.clauses.append([self.literal(sentence)])
+
+    def literal(self, sentence):
+        """
+        Returns a literal equivalent to sentence, adding the clauses
+        that define any new variables it needs.
+        """
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        if sentence in self.definitions:
+            return self.definitions[sentence]
+
+        if isinstance(sentence, And):
+            literal = self._define_and([self.literal(c) for c in sentence.conjuncts])
+        elif isinstance(sentence, Or):
+            literal = -self._define_and([-self.literal(d) for d in sentence.disjuncts])
+        elif isinstance(sentence, Implication):
+            literal = -self._define_and([self.literal(sentence.antecedent),
+                                         -self.literal(sentence.consequent)])
+        elif isinstance(sentence, Biconditional):
+            literal = self._define_iff(self.literal(sentence.left),
+                                       self.literal(sentence.right))
+        else:
+            raise TypeError(f"cannot convert {type(sentence).__name__} to CNF")
+
+        self.definitions[sentence] = literal
+        return literal
+
+    def _define_and(self, literals):
+        """Returns a fresh variable v with clauses for v <=> AND(literals)."""
+        if len(literals) == 1:
+            return literals[0]
+        v = self.fresh()
+        for literal in literals:
+            self.clauses.append([-v, literal])
+        self.clauses.append([v] + [-literal for literal in literals])
+        return v
+
+    def _define_iff(self, a, b):
+        """Returns a fresh variable v with clauses for v <=> (a <=> b)."""
+        v = self.fresh()
+        self.clauses.append([-v, -a, b])
+        self.clauses.append([-v, a, -b])
+        self.clauses.append([v, a, b])
+        self.clauses.append([v, -a, -b])
+        return v
+
+
+def to_cnf(sentence):
+    """Returns a CNF holding the clauses of sentence."""
+    cnf = CNF()
+    cnf.add(sentence)
+    return cnf
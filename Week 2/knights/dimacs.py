@@ -0,0 +1,104 @@
+"""
+Reading and writing CNF in the DIMACS format.
+
+    p cnf <variables> <clauses>
+    1 -2 0
+    2 3 -1 0
+
+Each clause is a list of nonzero literals ended by 0, and may span
+lines. Symbol names are kept in "c symbol <variable> <name>" comments,
+which other tools ignore. Files are read a line at a time, so clauses
+can be streamed straight into a solver.
+"""
+
+from cnf import CNF
+from logic import Symbol, Not, And, Or
+
+
+def read_clauses(f):
+    """Yields each clause in an open DIMACS file as a list of ints."""
+    for comment, clause in _read(f):
+        if comment is None:
+            yield clause
+
+
+def read(f):
+    """
+    Reads an open DIMACS file. Returns a CNF holding its clauses, with
+    the symbol names from its comments or the variable numbers as names.
+    """
+    cnf = CNF()
+    names = {}
+    num_variables = 0
+    for comment, clause in _read(f):
+        if comment is not None:
+            variable, name = comment
+            names[variable] = name
+            num_variables = max(num_variables, variable)
+        else:
+            cnf.clauses.append(clause)
+            num_variables = max([num_variables] + [abs(n) for n in clause])
+
+    for variable in range(1, num_variables + 1):
+        cnf.variable(names.get(variable, str(variable)))
+    return cnf
+
+
+def load_into(f, solver):
+    """
+    Adds every clause in an open DIMACS file to solver as it is read.
+    Returns False if the solver found the clauses unsatisfiable.
+    """
+    ok = True
+    for clause in read_clauses(f):
+        ok = solver.add_clause(clause) and ok
+    return ok
+
+
+def to_sentence(cnf):
+    """Returns an And of one Or per clause of cnf."""
+    def literal(n):
+        symbol = Symbol(cnf.names[abs(n)] or str(abs(n)))
+        return symbol if n > 0 else Not(symbol)
+    return And(*[Or(*[literal(n) for n in clause]) for clause in cnf.clauses])
+
+
+def write(f, cnf):
+    """Writes cnf to an open file in DIMACS format, with symbol names."""
+    f.write(f"p cnf {cnf.num_variables} {len(cnf.clauses)}\n")
+    for variable, name in enumerate(cnf.names):
+        if name is not None:
+            f.write(f"c symbol {variable} {name}\n")
+    for clause in cnf.clauses:
+        f.write(" ".join(map(str, clause)) + " 0\n")
+
+
+def _read(f):
+    """
+    Yields ((variable, name), None) for each symbol name comment and
+    (None, clause) for each clause in an open DIMACS file.
+    """
+    clause = []
+    for number, line in enumerate(f, start=1):
+        line = line.strip()
+        if not line or line.startswith("p"):
+            continue
+        if line.startswith("c"):
+            parts = line.split(maxsplit=3)
+            if len(parts) == 4 and parts[1] == "symbol" and parts[2].isdigit():
+                yield (int(parts[2]), parts[3]), None
+            continue
+        if line.startswith("%"):
+            break
+        for token in line.split():
+            try:
+                literal = int(token)
+            except ValueError:
+                raise ValueError(f"line {number}: bad literal {token!r}") from None
+            if literal == 0:
+                yield None, clause
+                clause = []
+            else:
+                clause.append(literal)
+    if clause:
+        yield None, clause
@@ -1,8 +1,21 @@
 import itertools
+import weakref
+
+# Interned sentences by class and arguments, for Sentence.make
+interned = weakref.WeakValueDictionary()
 
 
 class Sentence():
 
+    # Hash and symbols, cached only on interned sentences since those
+    # never change, and whether the sentence is interned
+    __slots__ = ("_hash", "_symbols", "_interned", "__weakref__")
+
+    def __init__(self):
+        self._hash = None
+        self._symbols = None
+        self._interned = False
+
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
@@ -13,7 +26,58 @@ class Sentence():
 
     def symbols(self):
         """Returns a set of all symbols in the logical sentence."""
-        return set()
+        return set(self.frozen_symbols())
+
+    def frozen_symbols(self):
+        """
+        Returns a frozenset of all symbols, computed once per interned
+        sentence and from the operands' sets otherwise.
+        """
+        if self._symbols is not None:
+            return self._symbols
+        symbols = self.find_symbols()
+        if self._interned:
+            self._symbols = symbols
+        return symbols
+
+    def cache_hash(self, value):
+        """Returns value, remembering it as the hash if interned."""
+        if self._interned:
+            self._hash = value
+        return value
+
+    def find_symbols(self):
+        """Returns a frozenset of all symbols, from those of the operands."""
+        return frozenset()
+
+    def arguments(self):
+        """Returns the arguments the sentence was constructed with."""
+        return ()
+
+    @classmethod
+    def make(cls, *arguments):
+        """
+        Returns the interned sentence cls(*arguments), so structurally
+        equal sentences built with make are the same object and share
+        their subterms. Interned sentences must not be changed.
+        """
+        arguments = tuple(intern(argument) if isinstance(argument, Sentence)
+                          else argument for argument in arguments)
+        key = (cls,) + tuple(id(argument) if isinstance(argument, Sentence)
+                             else argument for argument in arguments)
+        sentence = interned.get(key)
+        if sentence is None:
+            sentence = cls(*arguments)
+            sentence._interned = True
+            interned[key] = sentence
+        return sentence
+
+    def expression(self, index):
+        """
+        Returns Python source for the sentence's value over a tuple m of
+        truth values, where index maps each symbol name to its position.
+        """
+        raise Exception("nothing to compile")
 
     @classmethod
     def validate(cls, sentence):
@@ -43,15 +107,21 @@ class Sentence():
 
 
 class Symbol(Sentence):
+    __slots__ = ("name",)
 
     def __init__(self, name):
+        Sentence.__init__(self)
         self.name = name
 
     def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+        return self is other or (
+            isinstance(other, Symbol) and self.name == other.name
+        )
 
     def __hash__(self):
-        return hash(("symbol", self.name))
+        if self._hash is not None:
+            return self._hash
+        return self.cache_hash(hash(("symbol", self.name)))
 
     def __repr__(self):
         return self.name
@@ -65,20 +135,33 @@ class Symbol(Sentence):
     def formula(self):
         return self.name
 
-    def symbols(self):
-        return {self.name}
+    def find_symbols(self):
+        return frozenset((self.name,))
+
+    def arguments(self):
+        return (self.name,)
+
+    def expression(self, index):
+        return f"m[{index[self.name]}]"
 
 
 class Not(Sentence):
+    __slots__ = ("operand",)
+
     def __init__(self, operand):
+        Sentence.__init__(self)
         Sentence.validate(operand)
         self.operand = operand
 
     def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+        return self is other or (
+            isinstance(other, Not) and self.operand == other.operand
+        )
 
     def __hash__(self):
-        return hash(("not", hash(self.operand)))
+        if self._hash is not None:
+            return self._hash
+        return self.cache_hash(hash(("not", hash(self.operand))))
 
     def __repr__(self):
         return f"Not({self.operand})"
@@ -89,23 +172,36 @@ class Not(Sentence):
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
-        return self.operand.symbols()
+    def find_symbols(self):
+        return self.operand.frozen_symbols()
+
+    def arguments(self):
+        return (self.operand,)
+
+    def expression(self, index):
+        return f"(not {self.operand.expression(index)})"
 
 
 class And(Sentence):
+    __slots__ = ("conjuncts",)
+
     def __init__(self, *conjuncts):
+        Sentence.__init__(self)
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
         self.conjuncts = list(conjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+        return self is other or (
+            isinstance(other, And) and self.conjuncts == other.conjuncts
+        )
 
     def __hash__(self):
-        return hash(
+        if self._hash is not None:
+            return self._hash
+        return self.cache_hash(hash(
             ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
-        )
+        ))
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -115,6 +211,8 @@ class And(Sentence):
 
     def add(self, conjunct):
         Sentence.validate(conjunct)
+        if self._interned:
+            raise TypeError("cannot add to an interned sentence")
         self.conjuncts.append(conjunct)
 
     def evaluate(self, model):
@@ -126,23 +224,42 @@ class And(Sentence):
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+    def find_symbols(self):
+        return frozenset().union(
+            *[conjunct.frozen_symbols() for conjunct in self.conjuncts]
+        )
+
+    def arguments(self):
+        return tuple(self.conjuncts)
+
+    def expression(self, index):
+        if not self.conjuncts:
+            return "True"
+        return "(" + " and ".join(
+            [conjunct.expression(index) for conjunct in self.conjuncts]
+        ) + ")"
 
 
 class Or(Sentence):
+    __slots__ = ("disjuncts",)
+
     def __init__(self, *disjuncts):
+        Sentence.__init__(self)
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
         self.disjuncts = list(disjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+        return self is other or (
+            isinstance(other, Or) and self.disjuncts == other.disjuncts
+        )
 
     def __hash__(self):
-        return hash(
+        if self._hash is not None:
+            return self._hash
+        return self.cache_hash(hash(
             ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
-        )
+        ))
 
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
@@ -157,24 +274,43 @@ class Or(Sentence):
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def find_symbols(self):
+        return frozenset().union(
+            *[disjunct.frozen_symbols() for disjunct in self.disjuncts]
+        )
+
+    def arguments(self):
+        return tuple(self.disjuncts)
+
+    def expression(self, index):
+        if not self.disjuncts:
+            return "False"
+        return "(" + " or ".join(
+            [disjunct.expression(index) for disjunct in self.disjuncts]
+        ) + ")"
 
 
 class Implication(Sentence):
+    __slots__ = ("antecedent", "consequent")
+
     def __init__(self, antecedent, consequent):
+        Sentence.__init__(self)
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
         self.antecedent = antecedent
         self.consequent = consequent
 
     def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
+        return self is other or (isinstance(other, Implication)
+                                 and self.antecedent == other.antecedent
+                                 and self.consequent == other.consequent)
 
     def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+        if self._hash is not None:
+            return self._hash
+        return self.cache_hash(hash(
+            ("implies", hash(self.antecedent), hash(self.consequent))
+        ))
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
@@ -188,76 +324,123 @@ class Implication(Sentence):
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+    def find_symbols(self):
+        return self.antecedent.frozen_symbols() | self.consequent.frozen_symbols()
+
+    def arguments(self):
+        return (self.antecedent, self.consequent)
+
+    def expression(self, index):
+        return (f"(not {self.antecedent.expression(index)} "
+                f"or {self.consequent.expression(index)})")
 
 
 class Biconditional(Sentence):
+    __slots__ = ("left", "right")
+
     def __init__(self, left, right):
+        Sentence.__init__(self)
         Sentence.validate(left)
         Sentence.validate(right)
         self.left = left
         self.right = right
 
     def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
+        return self is other or (isinstance(other, Biconditional)
+                                 and self.left == other.left
+                                 and self.right == other.right)
 
     def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+        if self._hash is not None:
+            return self._hash
+        return self.cache_hash(hash(
+            ("biconditional", hash(self.left), hash(self.right))
+        ))
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
 
     def evaluate(self, model):
-        return ((self.left.evaluate(model)
-                 and self.right.evaluate(model))
-                or (not self.left.evaluate(model)
-                    and not self.right.evaluate(model)))
+        return self.left.evaluate(model) == self.right.evaluate(model)
 
     def formula(self):
-        left = Sentence.parenthesize(str(self.left))
-        right = Sentence.parenthesize(str(self.right))
+        left = Sentence.parenthesize(self.left.formula())
+        right = Sentence.parenthesize(self.right.formula())
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
-
+    def find_symbols(self):
+        return self.left.frozen_symbols() | self.right.frozen_symbols()
 
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+    def arguments(self):
+        return (self.left, self.right)
 
-    def check_all(knowledge, query, symbols, model):
-        """Checks if knowledge base entails query, given a particular model."""
+    def expression(self, index):
+        return (f"({self.left.expression(index)} "
+                f"== {self.right.expression(index)})")
 
-        # If model has an assignment for each symbol
-        if not symbols:
 
-            # If knowledge base is true in model, then query must also be true
-            if knowledge.evaluate(model):
-                return query.evaluate(model)
-            return True
-        else:
+def intern(sentence):
+    """Returns the interned sentence structurally equal to sentence."""
+    if sentence._interned:
+        return sentence
+    return type(sentence).make(*sentence.arguments())
 
-            # Choose one of the remaining unused symbols
-            remaining = symbols.copy()
-            p = remaining.pop()
 
-            # Create a model where the symbol is true
-            model_true = model.copy()
-            model_true[p] = True
+def compile_sentence(sentence, symbols):
+    """
+    Returns a function of a tuple of truth values, one per name in
+    symbols in order, that evaluates the sentence.
 
-            # Create a model where the symbol is false
-            model_false = model.copy()
-            model_false[p] = False
+    The sentence is turned into the source of a single lambda, so
+    evaluating it is one call with no tree walking or dict lookups.
+    Sentences nested too deeply for Python's parser fall back to
+    evaluate.
+    """
+    symbols = list(symbols)
+    index = {name: i for i, name in enumerate(symbols)}
+    try:
+        return eval("lambda m: " + sentence.expression(index))
+    except (RecursionError, SyntaxError, MemoryError):
+        return lambda m: sentence.evaluate(dict(zip(symbols, m)))
 
-            # Ensure entailment holds in both models
-            return (check_all(knowledge, query, remaining, model_true) and
-                    check_all(knowledge, query, remaining, model_false))
 
-    # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
+def model_check(knowledge, query):
+    """Checks if knowledge base entails query."""
 
-    # Check that knowledge entails query
-    return check_all(knowledge, query, symbols, dict())
+    # Get all symbols in both knowledge and query, in a fixed order
+    symbols = sorted(knowledge.frozen_symbols() | query.frozen_symbols())
+
+    # Compile both sentences to functions of a tuple of truth values
+    knowledge_true = compile_sentence(knowledge, symbols)
+    query_true = compile_sentence(query, symbols)
+
+    # In every model where knowledge base is true, query must also be true
+    for model in itertools.product((True, False), repeat=len(symbols)):
+        if knowledge_true(model) and not query_true(model):
+            return False
+    return True
+
+
+def entailed_symbols(knowledge, candidates):
+    """
+    Returns the candidate sentences that knowledge base entails, in order.
+
+    Every model is enumerated once for all candidates, instead of once
+    per call to model_check.
+    """
+    candidates = list(candidates)
+    symbols = sorted(knowledge.frozen_symbols().union(
+        *[candidate.frozen_symbols() for candidate in candidates]
+    ))
+    knowledge_true = compile_sentence(knowledge, symbols)
+
+    # Candidates not yet seen false in a model of the knowledge base
+    remaining = [(candidate, compile_sentence(candidate, symbols))
+                 for candidate in candidates]
+    for model in itertools.product((True, False), repeat=len(symbols)):
+        if knowledge_true(model):
+            remaining = [(candidate, true) for candidate, true in remaining
+                         if true(model)]
+            if not remaining:
+                break
+    return [candidate for candidate, _ in remaining]
@@ -0,0 +1,160 @@
+"""
+Parser for the formula syntax that Sentence.formula() writes.
+
+    ¬a          Not        (also ~)
+    a ∧ b ∧ c   And        (also &)
+    a ∨ b ∨ c   Or         (also |)
+    a => b      Implication
+    a <=> b     Biconditional
+
+Binding is tightest for ¬, then ∧, ∨, => and <=>; => groups to the
+right. Symbol names are any run of other characters, spaces included,
+so "(A is a Knight) => (B is a Knave)" is an implication between two
+symbols.
+
+Knowledge base files hold one sentence per line, with blank lines and
+lines starting with # skipped, and are read a line at a time.
+"""
+
+import re
+
+from logic import Symbol, Not, And, Or, Implication, Biconditional
+
+# Operators and parentheses, or a symbol name running up to the next one
+TOKEN = re.compile(r"(<=>|=>|[¬~∧&∨|()])|((?:(?!<=>|=>)[^¬~∧&∨|()])+)")
+
+NOT = {"¬", "~"}
+AND = {"∧", "&"}
+OR = {"∨", "|"}
+
+
+class ParseError(ValueError):
+    pass
+
+
+def tokenize(text):
+    """Returns the list of operator and symbol name tokens in text."""
+    tokens = []
+    for match in TOKEN.finditer(text):
+        operator, name = match.groups()
+        if operator is not None:
+            tokens.append(operator)
+        elif name.strip():
+            tokens.append(Symbol(name.strip()))
+    return tokens
+
+
+class Parser():
+    """
+    Recursive descent parser over the tokens of one sentence.
+    If interned, sentences are built with Sentence.make.
+    """
+
+    def __init__(self, tokens, interned=False):
+        self.tokens = tokens
+        self.position = 0
+        self.interned = interned
+
+    def parse(self):
+        sentence = self.biconditional()
+        if self.position != len(self.tokens):
+            raise ParseError(f"unexpected {self.peek()!r}")
+        return sentence
+
+    def peek(self):
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return None
+
+    def take(self):
+        token = self.peek()
+        if token is None:
+            raise ParseError("unexpected end of formula")
+        self.position += 1
+        return token
+
+    def build(self, cls, *arguments):
+        if self.interned:
+            return cls.make(*arguments)
+        return cls(*arguments)
+
+    def biconditional(self):
+        left = self.implication()
+        while self.peek() == "<=>":
+            self.take()
+            left = self.build(Biconditional, left, self.implication())
+        return left
+
+    def implication(self):
+        antecedent = self.disjunction()
+        if self.peek() == "=>":
+            self.take()
+            return self.build(Implication, antecedent, self.implication())
+        return antecedent
+
+    def disjunction(self):
+        disjuncts = [self.conjunction()]
+        while self.peek() in OR:
+            self.take()
+            disjuncts.append(self.conjunction())
+        if len(disjuncts) == 1:
+            return disjuncts[0]
+        return self.build(Or, *disjuncts)
+
+    def conjunction(self):
+        conjuncts = [self.negation()]
+        while self.peek() in AND:
+            self.take()
+            conjuncts.append(self.negation())
+        if len(conjuncts) == 1:
+            return conjuncts[0]
+        return self.build(And, *conjuncts)
+
+    def negation(self):
+        token = self.take()
+        if token in NOT:
+            return self.build(Not, self.negation())
+        if token == "(":
+            sentence = self.biconditional()
+            if self.take() != ")":
+                raise ParseError("expected )")
+            return sentence
+        if isinstance(token, Symbol):
+            return Symbol.make(token.name) if self.interned else token
+        raise ParseError(f"unexpected {token!r}")
+
+
+def parse(text, interned=False):
+    """Returns the Sentence written as text."""
+    return Parser(tokenize(text), interned).parse()
+
+
+def read_sentences(f, interned=False):
+    """
+    Yields the sentence on each line of an open file, skipping blank
+    lines and # comments.
+    """
+    for number, line in enumerate(f, start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            yield parse(line, interned)
+        except ParseError as e:
+            raise ParseError(f"line {number}: {e}") from None
+
+
+def load_knowledge(path, interned=False):
+    """Returns an And of every sentence in the knowledge base file at path."""
+    knowledge = And()
+    with open(path, encoding="utf-8") as f:
+        for sentence in read_sentences(f, interned):
+            knowledge.add(sentence)
+    return knowledge
+
+
+def write_knowledge(path, sentences):
+    """Writes sentences to path, one formula per line."""
+    with open(path, "w", encoding="utf-8") as f:
+        for sentence in sentences:
+            f.write(sentence.formula() + "\n")
@@ -0,0 +1,241 @@
+"""
+Resolution theorem proving for logic.py sentences.
+
+Knowledge base entails query when resolution derives the empty clause
+from the clauses of KB ∧ ¬query. Clauses are indexed by literal so each
+one is only resolved against clauses it clashes with, tautologies are
+dropped, and clauses subsumed by a shorter one are never kept.
+
+With the set-of-support strategy, only clauses descending from ¬query
+are resolved together with the rest, which keeps the search on the
+query. That is only complete for a consistent knowledge base, so when
+it ends without a proof the knowledge base is checked with the SAT
+solver, and an inconsistent one is proved by saturation instead.
+
+Usage: python resolution.py knowledge_file query
+"""
+
+import heapq
+import sys
+
+import parse
+from cnf import CNF
+from logic import Not
+from sat import Solver
+
+# Kept clauses after which a proof attempt gives up
+MAX_CLAUSES = 100000
+
+
+class Proof():
+    """
+    Outcome and counters of one proof attempt.
+    """
+
+    def __init__(self):
+        # True if query is entailed, False if not, None if gave up
+        self.entailed = None
+
+        # Resolution steps in the derivation of the empty clause
+        self.steps = 0
+
+        # Clauses from the knowledge base and negated query
+        self.initial = 0
+
+        # Resolvents produced, and clauses kept at the end
+        self.generated = 0
+        self.kept = 0
+
+        # Clauses dropped as tautologies or as subsumed by another
+        self.tautologies = 0
+        self.subsumed = 0
+
+    def __repr__(self):
+        return (f"Proof(entailed={self.entailed}, steps={self.steps}, "
+                f"initial={self.initial}, generated={self.generated}, "
+                f"kept={self.kept}, tautologies={self.tautologies}, "
+                f"subsumed={self.subsumed})")
+
+
+class Resolution():
+    """
+    Given-clause resolution over clauses as frozensets of int literals.
+    """
+
+    def __init__(self, proof, max_clauses=MAX_CLAUSES):
+        self.proof = proof
+        self.max_clauses = max_clauses
+
+        # Clauses kept, and the clauses containing each literal
+        self.kept = set()
+        self.index = {}
+
+        # Kept clauses already resolved against each other, and the rest
+        # waiting in order of length
+        self.processed = set()
+        self.queue = []
+        self.counter = 0
+
+        # Clause -> the two clauses it was resolved from, or None if given
+        self.parents = {}
+
+    def add(self, clause, parents=None, waiting=True):
+        """
+        Keeps clause unless a kept clause subsumes it, dropping any
+        kept clauses it subsumes. Returns True if it was kept.
+        """
+        if any(-literal in clause for literal in clause):
+            self.proof.tautologies += 1
+            return False
+        if self.subsumed(clause):
+            self.proof.subsumed += 1
+            return False
+        for other in self.subsumes(clause):
+            self.remove(other)
+            self.proof.subsumed += 1
+
+        self.kept.add(clause)
+        self.parents[clause] = parents
+        for literal in clause:
+            self.index.setdefault(literal, set()).add(clause)
+        if waiting:
+            heapq.heappush(self.queue, (len(clause), self.counter, clause))
+            self.counter += 1
+        else:
+            self.processed.add(clause)
+        return True
+
+    def remove(self, clause):
+        self.kept.discard(clause)
+        self.processed.discard(clause)
+        for literal in clause:
+            self.index[literal].discard(clause)
+
+    def subsumed(self, clause):
+        """Returns True if a kept clause is a subset of clause."""
+        if clause in self.kept:
+            return True
+        for literal in clause:
+            for other in self.index.get(literal, ()):
+                if len(other) <= len(clause) and other <= clause:
+                    return True
+        return False
+
+    def subsumes(self, clause):
+        """Returns the kept clauses that clause is a proper subset of."""
+        if not clause:
+            return []
+
+        # Every superset contains the literal in the fewest clauses
+        rarest = min(clause, key=lambda literal: len(self.index.get(literal, ())))
+        return [other for other in self.index.get(rarest, ())
+                if len(other) > len(clause) and clause <= other]
+
+    def run(self):
+        """
+        Resolves waiting clauses against processed ones until the empty
+        clause is derived, nothing is left to resolve, or too many
+        clauses are kept. Returns the empty clause, False or None.
+        """
+        empty = frozenset()
+        if empty in self.kept:
+            return empty
+
+        while self.queue:
+            _, _, given = heapq.heappop(self.queue)
+            if given not in self.kept or given in self.processed:
+                continue
+            self.processed.add(given)
+
+            for literal in given:
+                for other in list(self.index.get(-literal, ())):
+                    if other not in self.processed:
+                        continue
+                    resolvent = (given - {literal}) | (other - {-literal})
+                    self.proof.generated += 1
+                    if self.add(resolvent, (given, other)) and not resolvent:
+                        return resolvent
+
+            if len(self.kept) > self.max_clauses:
+                return None
+        return False
+
+    def steps(self, clause):
+        """Returns the number of resolutions in the derivation of clause."""
+        derived = set()
+        stack = [clause]
+        while stack:
+            clause = stack.pop()
+            parents = self.parents.get(clause)
+            if parents is not None and clause not in derived:
+                derived.add(clause)
+                stack.extend(parents)
+        return len(derived)
+
+
+def prove(knowledge, query, set_of_support=True, max_clauses=MAX_CLAUSES):
+    """
+    Tries to prove that knowledge base entails query by resolution.
+    Returns a Proof.
+    """
+    proof = _prove(knowledge, query, set_of_support, max_clauses)
+
+    # An inconsistent knowledge base entails everything, but no clause
+    # of it need descend from the set of support
+    if set_of_support and proof.entailed is False and not _consistent(knowledge):
+        proof = _prove(knowledge, query, False, max_clauses)
+    return proof
+
+
+def _consistent(knowledge):
+    cnf = CNF()
+    cnf.add(knowledge)
+    return Solver(cnf.clauses, cnf.num_variables).solve()
+
+
+def _prove(knowledge, query, set_of_support, max_clauses):
+    cnf = CNF()
+    cnf.add(knowledge)
+    support_start = len(cnf.clauses)
+    cnf.add(Not(query))
+
+    proof = Proof()
+    proof.initial = len(cnf.clauses)
+    resolution = Resolution(proof, max_clauses)
+
+    # With a set of support, knowledge base clauses are never resolved
+    # with each other, only with clauses from the negated query
+    for n, clause in enumerate(cnf.clauses):
+        waiting = not set_of_support or n >= support_start
+        resolution.add(frozenset(clause), waiting=waiting)
+
+    result = resolution.run()
+    if result is None:
+        proof.entailed = None
+    elif result is False:
+        proof.entailed = False
+    else:
+        proof.entailed = True
+        proof.steps = resolution.steps(result)
+    proof.kept = len(resolution.kept)
+    return proof
+
+
+def entails(knowledge, query, set_of_support=True):
+    """Checks if knowledge base entails query, by resolution."""
+    return prove(knowledge, query, set_of_support).entailed
+
+
+def main():
+    if len(sys.argv) != 3:
+        sys.exit("Usage: python resolution.py knowledge_file query")
+    knowledge = parse.load_knowledge(sys.argv[1])
+    query = parse.parse(sys.argv[2])
+
+    for set_of_support in (True, False):
+        strategy = "set of support" if set_of_support else "saturation"
+        print(f"{strategy}: {prove(knowledge, query, set_of_support)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+"""
+A CDCL SAT solver, and entailment checking on top of it.
+
+Knowledge base entails query exactly when KB ∧ ¬query has no model, so
+instead of enumerating all 2^n models the solver searches for one
+counterexample, learning a clause from every conflict it hits.
+"""
+
+from cnf import CNF
+
+# Activity decay per conflict for the variable ordering heuristic
+DECAY = 0.95
+
+# Conflicts before the first restart, and the growth of that limit
+RESTART_FIRST = 100
+RESTART_GROWTH = 1.5
+
+
+class Solver():
+    """
+    Conflict-driven clause learning over int literals (v or -v).
+
+    Clauses can be added between calls to solve, and clauses learnt in
+    one call are kept for the next, so a series of related queries
+    costs little more than the first.
+    """
+
+    def __init__(self, clauses=(), num_variables=0):
+        self.num_variables = 0
+
+        # False once the clauses are known to be unsatisfiable
+        self.ok = True
+
+        # Per variable: 1 true, -1 false, 0 unassigned; decision level;
+        # clause that implied it; activity; last value it had
+        self.value = [0]
+        self.level = [0]
+        self.reason = [None]
+        self.activity = [0.0]
+        self.phase = [-1]
+        self.increment = 1.0
+
+        # Clauses watching each literal: watches[code(l)] holds clauses
+        # whose first or second literal is l, visited when l turns false
+        self.watches = [[], []]
+        self.clauses = []
+        self.learnt = []
+
+        # Assigned literals in order, and where each decision level starts
+        self.trail = []
+        self.trail_lim = []
+        self.queue_head = 0
+
+        # Values of the last model found, indexed by variable
+        self.model = None
+
+        self.conflicts = 0
+        self.decisions = 0
+        self.propagations = 0
+
+        self._grow(num_variables)
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def add_clause(self, literals):
+        """
+        Adds a clause. Returns False if the clauses are now known to be
+        unsatisfiable.
+        """
+        if not self.ok:
+            return False
+        self._backtrack(0)
+        for literal in literals:
+            self._grow(abs(literal))
+
+        # Drop duplicates and literals false for good; skip tautologies
+        # and clauses already satisfied
+        clause = []
+        for literal in literals:
+            value = self._value(literal)
+            if value == 1 or -literal in clause:
+                return True
+            if value == 0 and literal not in clause:
+                clause.append(literal)
+
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self._assign(clause[0], None)
+            self.ok = self._propagate() is None
+        else:
+            self._attach(clause)
+            self.clauses.append(clause)
+        return self.ok
+
+    def solve(self, assumptions=()):
+        """
+        Returns True if the clauses have a model in which every literal
+        in assumptions is true, storing it in self.model.
+        """
+        if not self.ok:
+            return False
+        for literal in assumptions:
+            self._grow(abs(literal))
+
+        restart_limit = RESTART_FIRST
+        conflicts_here = 0
+        while True:
+            conflict = self._propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                conflicts_here += 1
+                if not self.trail_lim:
+                    self.ok = False
+                    return False
+                learnt, level = self._analyze(conflict)
+                self._backtrack(level)
+                if len(learnt) == 1:
+                    self._assign(learnt[0], None)
+                else:
+                    self._attach(learnt)
+                    self.learnt.append(learnt)
+                    self._assign(learnt[0], learnt)
+                self.increment /= DECAY
+                continue
+
+            if conflicts_here >= restart_limit:
+                conflicts_here = 0
+                restart_limit *= RESTART_GROWTH
+                self._backtrack(0)
+                continue
+
+            # Assumptions are decided first, one per decision level
+            literal = None
+            while len(self.trail_lim) < len(assumptions):
+                assumption = assumptions[len(self.trail_lim)]
+                value = self._value(assumption)
+                if value == -1:
+                    self._backtrack(0)
+                    return False
+                self.trail_lim.append(len(self.trail))
+                if value == 0:
+                    literal = assumption
+                    break
+
+            if literal is None:
+                literal = self._pick()
+                if literal is None:
+                    self.model = self.value[:]
+                    self._backtrack(0)
+                    return True
+                self.trail_lim.append(len(self.trail))
+            self.decisions += 1
+            self._assign(literal, None)
+
+    def model_value(self, literal):
+        """Returns whether literal is true in the last model found."""
+        return self.model[abs(literal)] == (1 if literal > 0 else -1)
+
+    def _grow(self, variable):
+        while self.num_variables < variable:
+            self.num_variables += 1
+            self.value.append(0)
+            self.level.append(0)
+            self.reason.append(None)
+            self.activity.append(0.0)
+            self.phase.append(-1)
+            self.watches.append([])
+            self.watches.append([])
+
+    def _value(self, literal):
+        value = self.value[abs(literal)]
+        return value if literal > 0 else -value
+
+    def _assign(self, literal, reason):
+        variable = abs(literal)
+        self.value[variable] = 1 if literal > 0 else -1
+        self.level[variable] = len(self.trail_lim)
+        self.reason[variable] = reason
+        self.trail.append(literal)
+
+    def _attach(self, clause):
+        self.watches[_code(clause[0])].append(clause)
+        self.watches[_code(clause[1])].append(clause)
+
+    def _propagate(self):
+        """
+        Assigns every literal forced by unit clauses.
+        Returns a clause with every literal false, or None.
+        """
+        while self.queue_head < len(self.trail):
+            false_literal = -self.trail[self.queue_head]
+            self.queue_head += 1
+            self.propagations += 1
+
+            watching = self.watches[_code(false_literal)]
+            kept = []
+            conflict = None
+            for n, clause in enumerate(watching):
+                if conflict is not None:
+                    kept.extend(watching[n:])
+                    break
+
+                # Keep the false literal second
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if self._value(clause[0]) == 1:
+                    kept.append(clause)
+                    continue
+
+                # Look for another literal to watch
+                for k in range(2, len(clause)):
+                    if self._value(clause[k]) != -1:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watches[_code(clause[1])].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if self._value(clause[0]) == -1:
+                        conflict = clause
+                    else:
+                        self._assign(clause[0], clause)
+            self.watches[_code(false_literal)] = kept
+            if conflict is not None:
+                return conflict
+        return None
+
+    def _analyze(self, conflict):
+        """
+        Returns (learnt clause, level to backjump to) for a conflict,
+        learning the first unique implication point clause. The
+        learnt clause's first literal is the one it asserts.
+        """
+        seen = set()
+        learnt = [None]
+        level = len(self.trail_lim)
+        pending = 0
+        index = len(self.trail) - 1
+        clause = conflict
+        implied = None
+
+        while True:
+            for literal in clause:
+                variable = abs(literal)
+                if variable == implied or variable in seen:
+                    continue
+                if self.level[variable] == 0:
+                    continue
+                seen.add(variable)
+                self._bump(variable)
+                if self.level[variable] == level:
+                    pending += 1
+                else:
+                    learnt.append(literal)
+
+            # Walk back to the next literal of this level in the conflict
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            implied = abs(literal)
+            seen.discard(implied)
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.reason[implied]
+
+        learnt[0] = -literal
+        if len(learnt) == 1:
+            return learnt, 0
+
+        # Watch the literal of the deepest remaining level second
+        deepest = max(range(1, len(learnt)), key=lambda n: self.level[abs(learnt[n])])
+        learnt[1], learnt[deepest] = learnt[deepest], learnt[1]
+        return learnt, self.level[abs(learnt[1])]
+
+    def _bump(self, variable):
+        self.activity[variable] += self.increment
+        if self.activity[variable] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.increment *= 1e-100
+
+    def _backtrack(self, level):
+        if len(self.trail_lim) <= level:
+            return
+        start = self.trail_lim[level]
+        for literal in self.trail[start:]:
+            variable = abs(literal)
+            self.phase[variable] = self.value[variable]
+            self.value[variable] = 0
+            self.reason[variable] = None
+        del self.trail[start:]
+        del self.trail_lim[level:]
+        self.queue_head = len(self.trail)
+
+    def _pick(self):
+        """Returns the unassigned variable with the highest activity, in
+        the polarity it last had, or None if every variable is assigned."""
+        best = None
+        for variable in range(1, self.num_variables + 1):
+            if self.value[variable] == 0 and (
+                best is None or self.activity[variable] > self.activity[best]
+            ):
+                best = variable
+        if best is None:
+            return None
+        return best if self.phase[best] == 1 else -best
+
+
+def _code(literal):
+    """Returns the index of literal in Solver.watches."""
+    return 2 * literal if literal > 0 else -2 * literal + 1
+
+
+def satisfiable(sentence):
+    """Returns a model of sentence as {symbol name: bool}, or None."""
+    cnf = CNF()
+    cnf.add(sentence)
+    solver = Solver(cnf.clauses, cnf.num_variables)
+    if not solver.solve():
+        return None
+    return {name: solver.model_value(variable)
+            for name, variable in cnf.variables.items()}
+
+
+def entails(knowledge, query):
+    """
+    Checks if knowledge base entails query, by asking the solver for a
+    model of knowledge in which query is false.
+    """
+    cnf = CNF()
+    cnf.add(knowledge)
+    literal = cnf.literal(query)
+    solver = Solver(cnf.clauses, cnf.num_variables)
+    return not solver.solve([-literal])
+
+
+def entailed_symbols(knowledge, candidates):
+    """
+    Returns the candidate sentences that knowledge base entails, in order.
+
+    One solver answers every candidate, keeping what it learns between
+    queries, and each model it finds rules out every candidate false
+    in that model without a query of its own.
+    """
+    cnf = CNF()
+    cnf.add(knowledge)
+    candidates = list(candidates)
+    literals = [cnf.literal(candidate) for candidate in candidates]
+    solver = Solver(cnf.clauses, cnf.num_variables)
+
+    refuted = set()
+    for n, literal in enumerate(literals):
+        if n in refuted:
+            continue
+        if solver.solve([-literal]):
+            refuted.update(m for m, other in enumerate(literals)
+                           if not solver.model_value(other))
+    return [candidate for n, candidate in enumerate(candidates)
+            if n not in refuted]